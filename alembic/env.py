@@ -20,7 +20,7 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 
 from app.database import Base
-from app.models import user,food,goal,meal
+from app.models import user,food,goal,meal,daily_total,job
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
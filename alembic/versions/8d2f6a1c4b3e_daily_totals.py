@@ -0,0 +1,53 @@
+"""daily totals
+
+Revision ID: 8d2f6a1c4b3e
+Revises: 1fe4569fc804
+Create Date: 2026-10-18 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f6a1c4b3e'
+down_revision: Union[str, Sequence[str], None] = '1fe4569fc804'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('calories', sa.Float(), nullable=False),
+    sa.Column('protein', sa.Float(), nullable=False),
+    sa.Column('carbs', sa.Float(), nullable=False),
+    sa.Column('fat', sa.Float(), nullable=False),
+    sa.Column('meal_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'date')
+    )
+    # Rellenar con las comidas ya registradas
+    # (equivale a python -m scripts.rebuild_daily_totals)
+    op.execute(
+        """
+        INSERT INTO daily_totals (user_id, date, calories, protein, carbs, fat, meal_count)
+        SELECT meals.user_id, meals.date,
+               SUM(foods.calories * meals.quantity / 100),
+               SUM(foods.protein * meals.quantity / 100),
+               SUM(foods.carbs * meals.quantity / 100),
+               SUM(foods.fat * meals.quantity / 100),
+               COUNT(meals.id)
+        FROM meals JOIN foods ON foods.id = meals.food_id
+        GROUP BY meals.user_id, meals.date
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_totals')
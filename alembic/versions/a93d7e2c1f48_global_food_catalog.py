@@ -0,0 +1,56 @@
+"""global food catalog
+
+Revision ID: a93d7e2c1f48
+Revises: f1a6d3c8b240
+Create Date: 2026-10-18 17:05:12.448210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.food import SQLITE_FTS_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d7e2c1f48'
+down_revision: Union[str, Sequence[str], None] = 'f1a6d3c8b240'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # user_id NULL = alimento del catálogo global
+    with op.batch_alter_table('foods') as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite recrea la tabla y se pierden los triggers de foods_fts
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+    op.create_index(
+        'ix_foods_global_name', 'foods', ['name'], unique=True,
+        postgresql_where=sa.text('user_id IS NULL'),
+        sqlite_where=sa.text('user_id IS NULL'),
+    )
+
+    catalog_meta = op.create_table(
+        'catalog_meta',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(catalog_meta, [{'id': 1, 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_meta')
+    op.drop_index('ix_foods_global_name', table_name='foods')
+    op.execute('DELETE FROM foods WHERE user_id IS NULL')
+    with op.batch_alter_table('foods') as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
@@ -0,0 +1,98 @@
+"""query indexes
+
+Revision ID: c47e1b9a5d20
+Revises: 8d2f6a1c4b3e
+Create Date: 2026-10-18 11:40:07.913352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e1b9a5d20'
+down_revision: Union[str, Sequence[str], None] = '8d2f6a1c4b3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Alimentos con el mismo nombre que otro anterior del mismo usuario
+DUPLICATE = """
+    EXISTS (SELECT 1 FROM foods kept
+            WHERE kept.user_id = foods.user_id AND kept.name = foods.name AND kept.id < foods.id)
+"""
+
+
+def dedupe_foods() -> None:
+    """
+    El índice único no se puede crear con nombres repetidos: se queda el
+    alimento de menor id, sus comidas pasan a él y se regeneran los
+    totales diarios de quien tenga comidas de los repetidos (los macros
+    pueden no coincidir). No solo el dueño: antes no se comprobaba de
+    quién era el alimento al registrar una comida.
+    """
+    bind = op.get_bind()
+    if bind.execute(sa.text(f"SELECT 1 FROM foods WHERE {DUPLICATE} LIMIT 1")).first() is None:
+        return
+    users = bind.execute(
+        sa.text(
+            f"SELECT DISTINCT user_id FROM meals "
+            f"WHERE food_id IN (SELECT id FROM foods WHERE {DUPLICATE})"
+        )
+    ).scalars().all()
+
+    op.execute(
+        f"""
+        UPDATE meals SET food_id = (
+            SELECT MIN(kept.id) FROM foods dup
+            JOIN foods kept ON kept.user_id = dup.user_id AND kept.name = dup.name
+            WHERE dup.id = meals.food_id
+        )
+        WHERE food_id IN (SELECT id FROM foods WHERE {DUPLICATE})
+        """
+    )
+    op.execute(f"DELETE FROM foods WHERE {DUPLICATE}")
+    if not users:
+        return
+
+    in_users = sa.bindparam("users", expanding=True)
+    bind.execute(
+        sa.text("DELETE FROM daily_totals WHERE user_id IN :users").bindparams(in_users),
+        {"users": users},
+    )
+    bind.execute(
+        sa.text(
+            """
+            INSERT INTO daily_totals (user_id, date, calories, protein, carbs, fat, meal_count)
+            SELECT meals.user_id, meals.date,
+                   SUM(foods.calories * meals.quantity / 100),
+                   SUM(foods.protein * meals.quantity / 100),
+                   SUM(foods.carbs * meals.quantity / 100),
+                   SUM(foods.fat * meals.quantity / 100),
+                   COUNT(meals.id)
+            FROM meals JOIN foods ON foods.id = meals.food_id
+            WHERE meals.user_id IN :users
+            GROUP BY meals.user_id, meals.date
+            """
+        ).bindparams(in_users),
+        {"users": users},
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # list_meals y resúmenes: WHERE user_id = ? AND date = ?
+    op.create_index('ix_meals_user_id_date', 'meals', ['user_id', 'date'], unique=False)
+    # update_food: días que usan un alimento
+    op.create_index('ix_meals_food_id', 'meals', ['food_id'], unique=False)
+    # list_foods (prefijo user_id) y nombre repetido por usuario
+    dedupe_foods()
+    op.create_index('ix_foods_user_id_name', 'foods', ['user_id', 'name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_foods_user_id_name', table_name='foods')
+    op.drop_index('ix_meals_food_id', table_name='meals')
+    op.drop_index('ix_meals_user_id_date', table_name='meals')
@@ -0,0 +1,52 @@
+"""recipes
+
+Revision ID: c5e08b7d2a19
+Revises: a93d7e2c1f48
+Create Date: 2026-10-18 18:42:37.915604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.food import SQLITE_FTS_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e08b7d2a19'
+down_revision: Union[str, Sequence[str], None] = 'a93d7e2c1f48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'foods',
+        sa.Column('is_recipe', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+    )
+    op.create_table(
+        'recipe_ingredients',
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.Column('food_id', sa.Integer(), nullable=False),
+        sa.Column('grams', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['recipe_id'], ['foods.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['food_id'], ['foods.id']),
+        sa.PrimaryKeyConstraint('recipe_id', 'food_id'),
+    )
+    op.create_index('ix_recipe_ingredients_food_id', 'recipe_ingredients', ['food_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recipe_ingredients_food_id', table_name='recipe_ingredients')
+    op.drop_table('recipe_ingredients')
+    op.execute('DELETE FROM meals WHERE food_id IN (SELECT id FROM foods WHERE is_recipe)')
+    op.execute('DELETE FROM foods WHERE is_recipe')
+    with op.batch_alter_table('foods') as batch_op:
+        batch_op.drop_column('is_recipe')
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite recrea la tabla y se pierden los triggers de foods_fts
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
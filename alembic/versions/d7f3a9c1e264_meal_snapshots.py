@@ -0,0 +1,74 @@
+"""meal nutrition snapshots
+
+Revision ID: d7f3a9c1e264
+Revises: c5e08b7d2a19
+Create Date: 2026-10-18 19:26:04.381170
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f3a9c1e264'
+down_revision: Union[str, Sequence[str], None] = 'c5e08b7d2a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MACROS = ('calories', 'protein', 'carbs', 'fat')
+# Filas por UPDATE al rellenar, para no bloquear meals entera
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('meals', sa.Column('food_name', sa.String(), nullable=True))
+    for m in MACROS:
+        op.add_column('meals', sa.Column(m, sa.Float(), nullable=True))
+
+    meals = sa.table(
+        'meals',
+        sa.column('id', sa.Integer()),
+        sa.column('food_id', sa.Integer()),
+        sa.column('quantity', sa.Float()),
+        sa.column('food_name', sa.String()),
+        *[sa.column(m, sa.Float()) for m in MACROS],
+    )
+    foods = sa.table(
+        'foods',
+        sa.column('id', sa.Integer()),
+        sa.column('name', sa.String()),
+        *[sa.column(m, sa.Float()) for m in MACROS],
+    )
+
+    # Cada tramo se confirma por separado (fuera de la transacción de la
+    # migración) para no tener meals entera bloqueada hasta el final. Solo
+    # toca filas sin copia: si se corta a medias, lo que falte se rellena
+    # con meals.backfill_snapshots()
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = bind.scalar(sa.select(sa.func.max(meals.c.id))) or 0
+        for start in range(0, last_id, BATCH_SIZE):
+            bind.execute(
+                meals.update()
+                .where(
+                    foods.c.id == meals.c.food_id,
+                    meals.c.id > start,
+                    meals.c.id <= start + BATCH_SIZE,
+                    meals.c.calories.is_(None),
+                )
+                .values(
+                    food_name=foods.c.name,
+                    **{m: foods.c[m] * meals.c.quantity / 100 for m in MACROS},
+                )
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('meals') as batch_op:
+        for m in reversed(MACROS):
+            batch_op.drop_column(m)
+        batch_op.drop_column('food_name')
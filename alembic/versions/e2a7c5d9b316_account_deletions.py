@@ -0,0 +1,38 @@
+"""account deletions
+
+Revision ID: e2a7c5d9b316
+Revises: b8c4e2f7a051
+Create Date: 2026-10-18 22:41:19.830615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5d9b316'
+down_revision: Union[str, Sequence[str], None] = 'b8c4e2f7a051'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_table(
+        'account_deletions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('requested_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('meals_deleted', sa.Integer(), nullable=False),
+        sa.Column('foods_deleted', sa.Integer(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('account_deletions')
+    op.drop_column('users', 'deleted_at')
@@ -0,0 +1,45 @@
+"""food name search
+
+Revision ID: e5b2c8f0a913
+Revises: c47e1b9a5d20
+Create Date: 2026-10-18 13:05:52.480116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.food import SQLITE_FTS_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2c8f0a913'
+down_revision: Union[str, Sequence[str], None] = 'c47e1b9a5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            'ix_foods_name_trgm', 'foods', ['name'], unique=False,
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+        )
+    elif op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO foods_fts(foods_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_foods_name_trgm', table_name='foods')
+    elif op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS foods_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS foods_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS foods_fts_ai")
+        op.execute("DROP TABLE IF EXISTS foods_fts")
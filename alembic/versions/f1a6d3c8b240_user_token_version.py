@@ -0,0 +1,28 @@
+"""user token version
+
+Revision ID: f1a6d3c8b240
+Revises: e5b2c8f0a913
+Create Date: 2026-10-18 15:22:44.017392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6d3c8b240'
+down_revision: Union[str, Sequence[str], None] = 'e5b2c8f0a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
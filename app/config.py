@@ -1,11 +1,116 @@
+from typing import Dict, Optional
+
 from pydantic import BaseSettings
 
 class Settings(BaseSettings):
-    database_url: srt
-    sectre_key: srt
-    debug: bool
+    database_url: str
+    # Si no se indica se deriva de database_url (postgresql+asyncpg://...)
+    async_database_url: Optional[str] = None
+    secret_key: str
+    debug: bool = False
+
+    # Pool de conexiones (por proceso/worker)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30  # segundos esperando una conexión libre
+    db_pool_recycle: int = 1800  # segundos; evita conexiones caducadas tras un failover
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # 0 = sin límite
+    # PgBouncer en modo transaction: sin prepared statements en el servidor
+    db_pgbouncer: bool = False
+
+    # Autenticación
+    access_token_expire_minutes: int = 60
+    # Si es True, get_current_user se fía del rol del token cuando el
+    # usuario no está en caché, sin consultar la BD; la versión del token
+    # se comprueba con la vigente en CACHE_BACKEND (app/utils/token_state.py)
+    auth_token_claims: bool = False
+    user_cache_size: int = 10000
+    user_cache_ttl: int = 60  # segundos; 0 desactiva la caché
+
+    # Hash de contraseñas
+    password_hash_rounds: int = 29000  # coste de PBKDF2; menos en tests
+    password_hash_workers: int = 2  # procesos; 0 = threadpool
+    password_hash_queue: int = 64  # operaciones en espera antes de responder 503
+
+    # Catálogo global de alimentos: cada cuántos segundos se comprueba si
+    # otro proceso lo ha cambiado (0 = en cada petición)
+    catalog_check_interval: float = 5
+
+    # Estado compartido entre workers (versiones para ETag, etc.):
+    # "memory" solo vale con un único proceso; con varios, "redis"
+    cache_backend: str = "memory"
+    redis_url: Optional[str] = None  # redis://localhost:6379/0
+
+    # Listados (GET /foods, GET /meals) serializados directamente desde las
+    # filas con orjson, sin validar cada elemento con el response_model
+    fast_json_lists: bool = False
+
+    # Las comidas guardan sus macros al registrarse y las lecturas no
+    # consultan foods; editar un alimento ya no cambia los días pasados.
+    # Al cambiarlo hay que regenerar daily_totals
+    meal_snapshots: bool = False
+
+    # Instrumentación: consultas que se registran en el log (0 = ninguna)
+    # y cabecera Server-Timing en las respuestas
+    slow_query_ms: int = 200
+    server_timing: bool = True
+
+    # Límite de peticiones (cubo de fichas) por usuario o IP; los
+    # presupuestos por ruta están en app/utils/rate_limit.py
+    rate_limit_enabled: bool = True
+    rate_limits: Dict[str, str] = {}  # {"login": "20/minute", ...}
+
+    # Trabajos en segundo plano (app/utils/jobs.py): cola en la tabla jobs
+    # ("database") o en memoria ("memory": tests, un solo proceso y con
+    # JOBS_IN_PROCESS). Los ejecuta scripts/worker.py o, con
+    # JOBS_IN_PROCESS, cada proceso de la API
+    job_backend: str = "database"
+    jobs_in_process: bool = False
+    job_concurrency: int = 4  # trabajos a la vez por worker
+    job_poll_interval: float = 1  # segundos entre consultas con la cola vacía
+    job_lease_seconds: int = 600  # en curso más tiempo = worker caído, se repite
+    # Filas por DELETE al borrar una cuenta o un alimento con comidas; cada
+    # tramo es una transacción corta
+    purge_batch_size: int = 5000
+
+    # Arranque: conexiones que se abren al arrancar la app para que las
+    # primeras peticiones no esperen a conectar (0 = ninguna)
+    db_pool_warmup: int = 1
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+
+_settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """Configuración del proceso; se lee del entorno (y .env) al primer uso."""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def configure(new_settings: Settings):
+    """Sustituye la configuración del proceso (ver create_app)."""
+    global _settings
+    _settings = new_settings
+
+
+class LazySettings:
+    """
+    `settings` de siempre, pero sin leer el entorno al importar: cada
+    atributo se busca en get_settings(). Así se pueden importar las rutas
+    y los servicios sin DATABASE_URL ni SECRET_KEY.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+
+settings = LazySettings()
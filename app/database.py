@@ -1,19 +1,197 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.config import settings
+from app.utils.db_metrics import PoolMetrics, listen_pool_events, metered_pool_class
+from app.utils.request_metrics import listen_query_events
+
+# Driver asíncrono para la misma base de datos
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://... (igual para SQLite)"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(
+        hide_password=False
+    )
+
+
+pool_metrics = {
+    "sync": PoolMetrics("sync"),
+    "async": PoolMetrics("async"),
+}
+
+
+def engine_options(url: str, metrics: PoolMetrics, is_async: bool) -> dict:
+    """
+    Opciones del motor a partir de Settings: tamaño del pool, recycle,
+    pre_ping, statement_timeout y modo PgBouncer.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "postgresql":
+        # SQLite (tests) se queda con el pool por defecto
+        return {}
+
+    options = {
+        "poolclass": metered_pool_class(metrics, is_async),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+    connect_args = {}
+    timeout = settings.db_statement_timeout_ms
+    if timeout and not settings.db_pgbouncer:
+        # Parámetro de arranque de la sesión (PgBouncer en modo transaction
+        # no lo admite: ver listen_statement_timeout)
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": str(timeout)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    if settings.db_pgbouncer and is_async:
+        # asyncpg prepara cada sentencia; con transaction pooling la
+        # siguiente transacción puede ir a otro servidor donde no existe
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def listen_statement_timeout(engine):
+    """
+    Con PgBouncer (modo transaction) el timeout se fija en cada transacción
+    con SET LOCAL, porque un SET de sesión acabaría en otro cliente.
+    """
+    @event.listens_for(engine, "begin")
+    def set_statement_timeout(conn):
+        conn.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {int(settings.db_statement_timeout_ms)}"
+        )
+
+
+class Engines:
+    """
+    Motores y fábricas de sesiones del proceso. Se crean la primera vez
+    que se usan (ver __getattr__), no al importar este módulo.
+    """
+
+    def __init__(self):
+        self.DATABASE_URL = settings.database_url
+        self.ASYNC_DATABASE_URL = settings.async_database_url or async_url(self.DATABASE_URL)
+
+        # Motor síncrono: scripts, migraciones y tareas fuera de las peticiones
+        self.engine = create_engine(
+            self.DATABASE_URL,
+            **engine_options(self.DATABASE_URL, pool_metrics["sync"], is_async=False),
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        # Motor asíncrono: lo usan todas las rutas de la API
+        self.async_engine = create_async_engine(
+            self.ASYNC_DATABASE_URL,
+            **engine_options(self.ASYNC_DATABASE_URL, pool_metrics["async"], is_async=True),
+        )
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            # Tras el commit los objetos se siguen serializando en la respuesta;
+            # con expire_on_commit se recargarían con un lazy load que en async falla
+            expire_on_commit=False,
+        )
+
+        for sync_engine, metrics in (
+            (self.engine, pool_metrics["sync"]),
+            (self.async_engine.sync_engine, pool_metrics["async"]),
+        ):
+            listen_pool_events(sync_engine, metrics)
+            # Tiempo y número de sentencias por petición, consultas lentas
+            listen_query_events(sync_engine)
+            if settings.db_pgbouncer and settings.db_statement_timeout_ms:
+                listen_statement_timeout(sync_engine)
+
+
+_engines: Optional[Engines] = None
+ENGINE_ATTRIBUTES = {
+    "DATABASE_URL", "ASYNC_DATABASE_URL",
+    "engine", "SessionLocal", "async_engine", "AsyncSessionLocal",
+}
+
+
+def engines() -> Engines:
+    global _engines
+    if _engines is None:
+        _engines = Engines()
+    return _engines
+
+
+def __getattr__(name):
+    # `from app.database import engine, SessionLocal` sigue funcionando:
+    # el atributo se resuelve (y el motor se crea) al pedirlo
+    if name in ENGINE_ATTRIBUTES:
+        return getattr(engines(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def dispose_engines():
+    """Cierra las conexiones de ambos pools; se vuelven a crear si hacen falta."""
+    global _engines
+    if _engines is not None:
+        _engines.engine.dispose()
+        await _engines.async_engine.dispose()
+        _engines = None
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def pool_stats() -> dict:
+    """Métricas de checkout/espera de los pools de ambos motores."""
+    return {
+        "sync": pool_metrics["sync"].snapshot(engines().engine.pool),
+        "async": pool_metrics["async"].snapshot(engines().async_engine.sync_engine.pool),
+    }
+
+
 def get_db():
-    db = SessionLocal()
+    db = engines().SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Sesión asíncrona por petición.
+    La lógica que trabaja con Session síncrona (app/services) se ejecuta con
+    `await db.run_sync(funcion, ...)`.
+    """
+    async with engines().AsyncSessionLocal() as db:
+        yield db
+
+
+def dialect_insert(db, model):
+    """
+    INSERT con soporte de ON CONFLICT (on_conflict_do_update/do_nothing)
+    para el dialecto de la sesión: PostgreSQL en producción, SQLite en tests.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
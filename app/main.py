@@ -1,23 +1,175 @@
+"""
+Punto de entrada de la API.
+
+    uvicorn app.main:app                     # configuración del entorno / .env
+    uvicorn --factory app.main:create_app    # lo mismo, con la factoría
+
+Importar este módulo no crea la app ni los motores de la BD: `app` se crea
+la primera vez que se pide y las conexiones se abren al arrancar.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
 from fastapi import FastAPI
-from app.routes import auth, users, foods, meals, goals
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import configure_mappers
+
+from app import config
+from app.config import Settings, settings
+
+logger = logging.getLogger("app.startup")
+
+# Un trabajo en cola más tiempo que esto al arrancar: no hay worker
+JOB_OVERDUE_SECONDS = 300
+
+
+def create_app(app_settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Crea la app. Con `app_settings` sustituye la configuración del proceso
+    (tiene que ser antes de usar la BD); sin ella se lee del entorno.
+    """
+    if app_settings is not None:
+        config.configure(app_settings)
+
+    # Las rutas (y con ellas modelos, esquemas y servicios) se importan aquí
+    from app.routes import auth, users, foods, meals, goals, health, catalog, metrics, recipes
+    from app.utils.etag import ETAG_HEADER
+    from app.utils.pagination import NEXT_CURSOR_HEADER
+    from app.utils.request_metrics import RequestMetricsMiddleware
+    from app.utils.security import user_cache
+
+    app = FastAPI(
+        default_response_class=ORJSONResponse,
+        # title="NutriTrace API",
+        # description="API para seguimiento nutricional",
+        # version ="1.0.0"
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
+    )
+    # Después de CORS para que quede por fuera y mida la petición completa
+    app.add_middleware(RequestMetricsMiddleware)
+
+    app.include_router(users.router)
+    app.include_router(foods.router)
+    app.include_router(catalog.router)
+    app.include_router(recipes.router)
+    app.include_router(meals.router)
+    app.include_router(goals.router)
+    app.include_router(auth.router)
+    app.include_router(health.router)
+    app.include_router(metrics.router)
+
+    user_cache.maxsize = settings.user_cache_size
+    user_cache.ttl = settings.user_cache_ttl
+
+    app.add_event_handler("startup", warm_up)
+    app.add_event_handler("shutdown", shut_down)
+    if settings.jobs_in_process:
+        add_job_worker(app)
+    return app
+
+
+def add_job_worker(app: FastAPI):
+    """Ejecuta los trabajos en segundo plano en el propio proceso de la API."""
+    from app.services import tasks  # registra los trabajos
+    from app.utils.jobs import JobWorker
+
+    async def start():
+        app.state.job_worker = JobWorker()
+        app.state.job_runner = asyncio.create_task(app.state.job_worker.run())
+
+    async def stop():
+        app.state.job_worker.stop()
+        await app.state.job_runner
+
+    app.add_event_handler("startup", start)
+    # Antes de shut_down, que cierra los motores
+    app.router.on_shutdown.insert(0, stop)
+
+
+async def warm_up():
+    """
+    Deja el worker listo antes de la primera petición: mapeos del ORM,
+    DB_POOL_WARMUP conexiones abiertas, catálogo global en memoria y los
+    procesos del hash de contraseñas. Si la BD no responde se arranca
+    igualmente y se conecta en la primera petición.
+    """
+    from app.database import engines
+    from app.services.catalog import catalog_cache
+    from app.utils.passwords import password_hasher
+
+    configure_mappers()
+
+    async def connect():
+        async with engines().async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        # A la vez, para que sean conexiones distintas que se quedan en el pool
+        await asyncio.gather(*[connect() for _ in range(settings.db_pool_warmup)])
+        async with engines().AsyncSessionLocal() as db:
+            await catalog_cache.get(db)
+            await check_job_worker(db)
+    except Exception:
+        logger.warning("No se ha podido precalentar la base de datos", exc_info=True)
+
+    await run_in_threadpool(password_hasher.start)
+
+
+async def check_job_worker(db):
+    """
+    Sin JOBS_IN_PROCESS los trabajos (recalcular totales, borrar cuentas)
+    los ejecuta scripts/worker.py: avisa si parece que no hay ninguno.
+    """
+    if settings.jobs_in_process:
+        return
+    if settings.job_backend == "memory":
+        logger.warning(
+            "JOB_BACKEND=memory sin JOBS_IN_PROCESS: los trabajos en segundo plano no se ejecutan"
+        )
+        return
+
+    from app.models.job import Job
+
+    overdue = await db.scalar(
+        select(func.count()).select_from(Job).where(
+            Job.status == "queued",
+            Job.run_at < datetime.utcnow() - timedelta(seconds=JOB_OVERDUE_SECONDS),
+        )
+    )
+    if overdue:
+        logger.warning(
+            "%d trabajos en cola sin ejecutar desde hace más de %d s: "
+            "¿está en marcha python -m scripts.worker (o JOBS_IN_PROCESS=true)?",
+            overdue, JOB_OVERDUE_SECONDS,
+        )
+
+
+async def shut_down():
+    from app.database import dispose_engines
+    from app.utils.passwords import password_hasher
+    from app.utils.redis_client import close_redis
+
+    password_hasher.shutdown()
+    await close_redis()
+    await dispose_engines()
+
 
-app = FastAPI(
-    # title="NutriTrace API",
-    # description="API para seguimiento nutricional",
-    # version ="1.0.0"
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"]
-)
-
-app.include_router(users.router)
-app.include_router(foods.router)
-app.include_router(meals.router)
-app.include_router(goals.router)
-app.include_router(auth.router)
\ No newline at end of file
+def __getattr__(name):
+    # `uvicorn app.main:app` y `from app.main import app`
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, ForeignKey, Float, Date
+from app.database import Base
+
+class DailyTotal(Base):
+    """
+    Totales nutricionales de un usuario por día.
+    Se mantiene incrementalmente al crear/editar/borrar comidas y al
+    editar alimentos (ver app/services/daily_totals.py).
+    """
+    __tablename__ = "daily_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    calories = Column(Float, nullable=False, default=0)
+    protein = Column(Float, nullable=False, default=0)
+    carbs = Column(Float, nullable=False, default=0)
+    fat = Column(Float, nullable=False, default=0)
+    meal_count = Column(Integer, nullable=False, default=0)
@@ -1,10 +1,30 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, Index, DDL, event, text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
 
 class Food(Base):
     __tablename__ = "foods"
+    __table_args__ = (
+        # list_foods (WHERE user_id = ?) y la comprobación de nombre repetido
+        # en create_food/update_food (WHERE user_id = ? AND name = ?)
+        Index("ix_foods_user_id_name", "user_id", "name", unique=True),
+        # El índice anterior no impide nombres repetidos con user_id NULL
+        Index(
+            "ix_foods_global_name",
+            "name",
+            unique=True,
+            postgresql_where=text("user_id IS NULL"),
+            sqlite_where=text("user_id IS NULL"),
+        ),
+        # Búsqueda por nombre (GET /foods/?search=) con pg_trgm
+        Index(
+            "ix_foods_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)  # 👈 quito unique=True, el nombre se repite entre usuarios
@@ -12,7 +32,78 @@ class Food(Base):
     protein = Column(Float, nullable=False)
     carbs = Column(Float, nullable=False)
     fat = Column(Float, nullable=False)
+    # Receta: los macros (por 100 g) se calculan de recipe_ingredients
+    is_recipe = Column(Boolean, nullable=False, default=False, server_default=text("false"))
 
-    # 🔹 Dueño del alimento
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # 🔹 Dueño del alimento; NULL = catálogo global, visible para todos
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     user = relationship("User", backref="foods")
+
+    @property
+    def is_global(self) -> bool:
+        return self.user_id is None
+
+
+class RecipeIngredient(Base):
+    """
+    Gramos de cada alimento en una receta. La receta es un Food con
+    is_recipe = True cuyos macros por 100 g se guardan ya calculados
+    (ver app/services/recipes.py), así una comida con una receta es una
+    sola fila en meals.
+    """
+    __tablename__ = "recipe_ingredients"
+    __table_args__ = (
+        # update_food: recetas que usan un alimento
+        Index("ix_recipe_ingredients_food_id", "food_id"),
+    )
+
+    recipe_id = Column(Integer, ForeignKey("foods.id", ondelete="CASCADE"), primary_key=True)
+    food_id = Column(Integer, ForeignKey("foods.id"), primary_key=True)
+    grams = Column(Float, nullable=False)
+
+
+class CatalogMeta(Base):
+    """
+    Una sola fila con la versión del catálogo global. Cada cambio de un
+    alimento global la incrementa y así las cachés de cada proceso saben
+    que tienen que recargar (ver app/services/catalog.py).
+    """
+    __tablename__ = "catalog_meta"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+# pg_trgm tiene que existir antes de crear el índice GIN
+event.listen(
+    Food.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# En SQLite (tests) la búsqueda usa una tabla FTS5 sincronizada con triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS foods_fts USING fts5("
+    "name, content='foods', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_ai AFTER INSERT ON foods BEGIN "
+    "INSERT INTO foods_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_ad AFTER DELETE ON foods BEGIN "
+    "INSERT INTO foods_fts(foods_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_au AFTER UPDATE OF name ON foods BEGIN "
+    "INSERT INTO foods_fts(foods_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO foods_fts(rowid, name) VALUES (new.id, new.name); END",
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(
+        Food.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+
+event.listen(
+    Food.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS foods_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,26 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text, func
+from app.database import Base
+
+
+class Job(Base):
+    """
+    Trabajo en segundo plano pendiente (ver app/utils/jobs.py). Se inserta
+    en la misma transacción que la escritura que lo origina y se borra al
+    terminar bien; los que agotan los reintentos quedan con status "failed".
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # claim(): los siguientes en cola por orden de run_at
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)  # nombre registrado con @task
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="queued")  # queued | running | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False)  # no antes de este momento (UTC)
+    locked_at = Column(DateTime, nullable=True)  # cuándo lo cogió un worker
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, ForeignKey, Float
+from sqlalchemy import Column, Integer, ForeignKey, Float, Index, String
 from sqlalchemy.orm import relationship
 from app.database import Base
 from sqlalchemy import Date, func
 
 class Meal(Base):
     __tablename__ = "meals"
+    __table_args__ = (
+        # list_meals, resúmenes diarios: WHERE user_id = ? AND date = ?
+        Index("ix_meals_user_id_date", "user_id", "date"),
+        # update_food recalcula los días que usan un alimento
+        Index("ix_meals_food_id", "food_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -12,6 +18,16 @@ class Meal(Base):
     quantity = Column(Float, nullable=False)  # gramos
     date = Column(Date, server_default=func.current_date())
 
+    # Copia del alimento al registrar la comida: macros ya multiplicados
+    # por quantity / 100. Con MEAL_SNAPSHOTS las lecturas usan estas
+    # columnas sin JOIN con foods y editar el alimento no cambia el pasado.
+    food_name = Column(String, nullable=True)
+    calories = Column(Float, nullable=True)
+    protein = Column(Float, nullable=True)
+    carbs = Column(Float, nullable=True)
+    fat = Column(Float, nullable=True)
+
     # Relaciones
     user = relationship("User", backref="meals")
-    food = relationship("Food", backref="meals", lazy="joined")
+    # Sin joinedload: las rutas leen los macros con meal_service.meal_rows()
+    food = relationship("Food", backref="meals")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Integer, String, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -9,4 +9,23 @@ class User(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
-    role = Column(String, default="user", nullable=False)
\ No newline at end of file
+    role = Column(String, default="user", nullable=False)
+    # Se incrementa al cambiar la contraseña: invalida los tokens anteriores
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
+    # Cuenta dada de baja: ya no puede entrar y sus datos se están borrando
+    # (ver AccountDeletion); la fila desaparece al terminar
+    deleted_at = Column(DateTime, nullable=True)
+
+
+class AccountDeletion(Base):
+    """
+    Progreso del borrado de una cuenta (app/services/purge.py). Sin FK
+    a users para que quede constancia cuando la fila del usuario ya no está.
+    """
+    __tablename__ = "account_deletions"
+
+    user_id = Column(Integer, primary_key=True)
+    requested_at = Column(DateTime, nullable=False, server_default=func.now())
+    meals_deleted = Column(Integer, nullable=False, default=0)
+    foods_deleted = Column(Integer, nullable=False, default=0)
+    finished_at = Column(DateTime, nullable=True)
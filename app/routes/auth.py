@@ -1,31 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserOut
+from app.schemas.user import CurrentUser, UserCreate, UserOut
 from app.schemas.auth import Token
+from app.utils.passwords import password_hasher
+from app.utils.rate_limit import limit_by_ip
 from app.utils.security import (
-    get_password_hash,
-    verify_password,
     create_access_token,
+    user_claims,
     get_current_user,
 )
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user.email).first()
+@router.post(
+    "/register",
+    response_model=UserOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_ip("register"))],
+)
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(User).where(User.email == user.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El email ya está registrado",
         )
 
-    hashed_password = get_password_hash(user.password)
+    # El hash es CPU: se hace en el pool de procesos
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(
         name=user.name,
         email=user.email,
@@ -34,29 +42,50 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return db_user
 
 
-@router.post("/login", response_model=Token)
-def login(
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_by_ip("login"))])
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    # Una cuenta dada de baja sigue en users hasta que se borran sus datos
+    if not user or user.deleted_at is not None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
         )
 
-    access_token = create_access_token({"sub": str(user.id)})
+    valid, new_hash = await password_hasher.verify_and_update(
+        form_data.password, user.password_hash
+    )
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciales incorrectas",
+        )
+
+    # Hash con un coste antiguo: se guarda rehecho con el actual
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
+    access_token = create_access_token(user_claims(user))
     return Token(access_token=access_token, token_type="bearer")
 
 
 
-@router.get("/me")
-def get_me(current_user: User = Depends(get_current_user)):
-    return current_user
+@router.get("/me", response_model=UserOut)
+async def get_me(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # Si current_user viene de los claims del token no trae name/email
+    if current_user.email:
+        return current_user
+    return await db.get(User, current_user.id)
@@ -0,0 +1,123 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.food import Food, RecipeIngredient
+from app.models.meal import Meal
+from app.schemas.food import FoodCreate, FoodOut
+from app.schemas.user import CurrentUser
+from app.services import daily_totals, tasks
+from app.services.catalog import bump_version, catalog_cache
+from app.utils.security import ensure_admin, get_current_user
+
+router = APIRouter(prefix="/catalog", tags=["Catalog"])
+
+# Los usuarios leen el catálogo con GET /foods/?scope=global; aquí solo
+# están las operaciones de administración.
+
+
+async def get_global_food(db: AsyncSession, food_id: int) -> Food:
+    db_food = await db.scalar(
+        select(Food).where(Food.id == food_id, Food.user_id.is_(None))
+    )
+    if not db_food:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alimento no encontrado en el catálogo",
+        )
+    return db_food
+
+
+async def ensure_name_free(db: AsyncSession, name: str):
+    name_in_use = await db.scalar(
+        select(Food.id).where(Food.user_id.is_(None), Food.name == name)
+    )
+    if name_in_use:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ya hay un alimento con ese nombre en el catálogo",
+        )
+
+
+@router.post("/", response_model=FoodOut, status_code=status.HTTP_201_CREATED)
+async def create_global_food(
+    food: FoodCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Añade un alimento al catálogo global (solo admin).
+    """
+    ensure_admin(current_user)
+    await ensure_name_free(db, food.name)
+
+    db_food = Food(**food.dict(), user_id=None)
+    db.add(db_food)
+    await bump_version(db)
+    await db.commit()
+    catalog_cache.invalidate()
+    return db_food
+
+
+@router.put("/{food_id}", response_model=FoodOut)
+async def update_global_food(
+    food_id: int,
+    food: FoodCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Actualiza un alimento del catálogo global (solo admin).
+    Los totales diarios de todos los usuarios que lo usan y las recetas
+    que lo llevan se recalculan en segundo plano.
+    """
+    ensure_admin(current_user)
+    db_food = await get_global_food(db, food_id)
+    if food.name != db_food.name:
+        await ensure_name_free(db, food.name)
+
+    old_macros = daily_totals.macros_of(db_food)
+    for field, value in food.dict().items():
+        setattr(db_food, field, value)
+
+    if daily_totals.macros_of(db_food) != old_macros:
+        tasks.refresh_foods.enqueue(db, food_ids=[db_food.id])
+    await bump_version(db)
+    await db.commit()
+    catalog_cache.invalidate()
+    return db_food
+
+
+@router.delete("/{food_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_global_food(
+    food_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Borra un alimento del catálogo global (solo admin). Si alguien lo ha
+    registrado en sus comidas o recetas responde 409: borrarlo se llevaría
+    el historial de otros usuarios.
+    """
+    ensure_admin(current_user)
+    db_food = await get_global_food(db, food_id)
+    if await db.scalar(
+        select(RecipeIngredient.recipe_id).where(RecipeIngredient.food_id == food_id).limit(1)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El alimento se usa en recetas de usuarios",
+        )
+
+    if await db.scalar(select(Meal.id).where(Meal.food_id == food_id).limit(1)):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El alimento está en comidas registradas",
+        )
+
+    await db.execute(delete(Food).where(Food.id == db_food.id))
+    await bump_version(db)
+    await db.commit()
+    catalog_cache.invalidate()
+    return None
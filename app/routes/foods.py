@@ -1,49 +1,179 @@
+import io
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.user import User
-from app.models.food import Food
-from app.schemas.food import FoodCreate, FoodOut
+from app.config import settings
+from app.database import get_async_db
+from app.models.food import Food, RecipeIngredient
+from app.models.meal import Meal
+from app.schemas.food import FoodCreate, FoodImportOut, FoodOut
+from app.services import daily_totals, export, food_import, food_search, tasks
+from app.services import catalog
+from app.services.catalog import FoodScope, catalog_cache, visible_to
+from app.services.nutrition import MACROS
+from app.utils.etag import bump_version, etag_for_current_user
+from app.utils.rate_limit import limit_by_user
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, paginate
+from app.utils.responses import rows_response
+from app.schemas.user import CurrentUser
 from app.utils.security import get_current_user
 
 router = APIRouter(prefix="/foods", tags=["Foods"])
 
+# Campos de FoodOut, para el listado rápido (FAST_JSON_LISTS)
+FOOD_FIELDS = ["id", "name", *MACROS, "is_global", "is_recipe"]
 
-@router.get("/", response_model=List[FoodOut])
-def list_foods(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+
+@router.get(
+    "/",
+    response_model=List[FoodOut],
+    dependencies=[
+        Depends(limit_by_user("search", when=lambda request: "search" in request.query_params)),
+        Depends(etag_for_current_user),
+    ],
+)
+async def list_foods(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
     search: Optional[str] = Query(None, description="Buscar por nombre"),
+    scope: FoodScope = Query(
+        FoodScope.all, description="all = propios + catálogo global, mine, global"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(20, ge=1, le=100, description="Tamaño de página"),
 ):
     """
-    Lista los alimentos del USUARIO ACTUAL.
-    Cada usuario solo ve los suyos.
+    Lista los alimentos que puede usar el USUARIO ACTUAL, ordenados por nombre:
+    los suyos y los del catálogo global. Un alimento propio con el mismo
+    nombre que uno global lo sustituye.
+    Con `search` devuelve los más relevantes primero (autocompletado).
+    Sin `search` se pagina: la cabecera X-Next-Cursor trae el `cursor`
+    de la página siguiente.
     """
-    query = db.query(Food).filter(Food.user_id == current_user.id)
-
     if search:
-        query = query.filter(Food.name.ilike(f"%{search}%"))
+        return await db.run_sync(
+            food_search.search_foods, current_user.id, search, limit, scope
+        )
 
-    return query.all()
+    columns = [Food.name, Food.id]
+    if scope == FoodScope.global_:
+        # El catálogo global se sirve desde la caché del proceso
+        catalog = await catalog_cache.get(db)
+        after = decode_cursor(cursor, columns) if cursor else None
+        rows = catalog.page(after, limit)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor([rows[-1].name, rows[-1].id])
+        if settings.fast_json_lists:
+            return rows_response(rows, FOOD_FIELDS, response)
+        return rows
 
+    if settings.fast_json_lists:
+        stmt = select(
+            Food.id,
+            Food.name,
+            *[getattr(Food, m) for m in MACROS],
+            Food.user_id.is_(None).label("is_global"),
+            Food.is_recipe,
+        ).where(visible_to(current_user.id, scope))
+        rows = await paginate(db, stmt, columns, cursor, limit, response, as_rows=True)
+        return rows_response(rows, FOOD_FIELDS, response)
 
-@router.get("/{food_id}", response_model=FoodOut)
-def get_food(
-    food_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    stmt = select(Food).where(visible_to(current_user.id, scope))
+    return await paginate(db, stmt, columns, cursor, limit, response)
+
+
+@router.get("/export", dependencies=[Depends(limit_by_user("export"))])
+async def export_foods(
+    format: export.ExportFormat = Query(export.ExportFormat.ndjson),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Devuelve un alimento del usuario actual.
+    Descarga todos los alimentos del usuario en NDJSON o CSV.
+    Se envían a medida que se leen de la base de datos.
     """
-    food = (
-        db.query(Food)
-        .filter(Food.id == food_id, Food.user_id == current_user.id)
-        .first()
+    fields = ["id", "name", *MACROS]
+    stmt = (
+        select(*[getattr(Food, f) for f in fields])
+        .where(Food.user_id == current_user.id)
+        .order_by(Food.name, Food.id)
+    )
+    return StreamingResponse(
+        export.stream_rows(stmt, fields, format),
+        media_type=export.MEDIA_TYPES[format],
+        headers=export.content_disposition("foods", format),
     )
+
+
+@router.post(
+    "/import",
+    response_model=FoodImportOut,
+    dependencies=[Depends(limit_by_user("import"))],
+)
+async def import_foods(
+    file: UploadFile = File(..., description="CSV (name,calories,protein,carbs,fat) o NDJSON"),
+    format: Optional[food_import.ImportFormat] = Query(
+        None, description="Por defecto según la extensión del fichero"
+    ),
+    on_duplicate: food_import.OnDuplicate = Query(
+        food_import.OnDuplicate.skip,
+        description="Qué hacer con los nombres que ya existen",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Importa alimentos del usuario desde un fichero (p.ej. exportado de otra app).
+    El fichero se lee línea a línea y se guarda en lotes; las líneas con
+    errores se saltan y se devuelven en `errors`.
+    """
+    fmt = format or food_import.guess_format(file.filename)
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+
+    def run(session):
+        return food_import.import_foods(
+            session,
+            current_user.id,
+            food_import.iter_records(lines, fmt),
+            on_duplicate,
+        )
+
+    try:
+        stats = await db.run_sync(run)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El fichero tiene que estar en UTF-8",
+        )
+    finally:
+        lines.detach()
+
+    await db.commit()
+    await bump_version(current_user.id)
+    return stats
+
+
+@router.get(
+    "/{food_id}",
+    response_model=FoodOut,
+    dependencies=[Depends(etag_for_current_user)],
+)
+async def get_food(
+    food_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Devuelve un alimento del usuario actual o del catálogo global.
+    """
+    food = await catalog.find_food(db, current_user.id, food_id)
     if not food:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,20 +183,19 @@ def get_food(
 
 
 @router.post("/", response_model=FoodOut, status_code=status.HTTP_201_CREATED)
-def create_food(
+async def create_food(
     food: FoodCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Crea un alimento para el usuario actual.
-    El mismo nombre se puede repetir entre distintos usuarios.
+    El mismo nombre se puede repetir entre distintos usuarios, y si
+    coincide con uno del catálogo global, el propio lo sustituye.
     """
     # Opcional: impedir nombre duplicado para ESTE usuario
-    existing = (
-        db.query(Food)
-        .filter(Food.user_id == current_user.id, Food.name == food.name)
-        .first()
+    existing = await db.scalar(
+        select(Food).where(Food.user_id == current_user.id, Food.name == food.name)
     )
     if existing:
         raise HTTPException(
@@ -83,39 +212,41 @@ def create_food(
         user_id=current_user.id,
     )
     db.add(db_food)
-    db.commit()
-    db.refresh(db_food)
+    await db.commit()
+    await bump_version(current_user.id)
+    await db.refresh(db_food)
     return db_food
 
 
 @router.put("/{food_id}", response_model=FoodOut)
-def update_food(
+async def update_food(
     food_id: int,
     food: FoodCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Actualiza un alimento del usuario.
     No puedes editar alimentos de otro usuario.
     """
-    db_food = (
-        db.query(Food)
-        .filter(Food.id == food_id, Food.user_id == current_user.id)
-        .first()
+    db_food = await db.scalar(
+        select(Food).where(Food.id == food_id, Food.user_id == current_user.id)
     )
     if not db_food:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alimento no encontrado",
         )
+    if db_food.is_recipe:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Las recetas se editan en /recipes/{food_id}",
+        )
 
     # Comprobar que el nuevo nombre no choque con otro alimento del mismo usuario
     if food.name != db_food.name:
-        name_in_use = (
-            db.query(Food)
-            .filter(Food.user_id == current_user.id, Food.name == food.name)
-            .first()
+        name_in_use = await db.scalar(
+            select(Food).where(Food.user_id == current_user.id, Food.name == food.name)
         )
         if name_in_use:
             raise HTTPException(
@@ -123,38 +254,76 @@ def update_food(
                 detail="Ya tienes otro alimento con ese nombre",
             )
 
+    old_macros = daily_totals.macros_of(db_food)
+
     db_food.name = food.name
     db_food.calories = food.calories
     db_food.protein = food.protein
     db_food.carbs = food.carbs
     db_food.fat = food.fat
 
-    db.commit()
-    db.refresh(db_food)
+    # Los días que lo usan (y las recetas que lo llevan) se recalculan
+    # en segundo plano
+    if daily_totals.macros_of(db_food) != old_macros:
+        tasks.refresh_foods.enqueue(db, food_ids=[db_food.id])
+
+    await db.commit()
+    await bump_version(current_user.id)
+    await db.refresh(db_food)
     return db_food
 
 
 @router.delete("/{food_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_food(
+async def delete_food(
     food_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Borra un alimento del usuario.
     No puedes borrar alimentos de otro.
+    Si está en comidas registradas, se borran con él por tramos en segundo
+    plano y se responde 202; si está en comidas de otro usuario o en
+    alguna receta, 409.
     """
-    db_food = (
-        db.query(Food)
-        .filter(Food.id == food_id, Food.user_id == current_user.id)
-        .first()
+    db_food = await db.scalar(
+        select(Food).where(Food.id == food_id, Food.user_id == current_user.id)
     )
     if not db_food:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alimento no encontrado",
         )
+    if db_food.is_recipe:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Las recetas se borran en /recipes/{food_id}",
+        )
+    if await db.scalar(
+        select(RecipeIngredient.recipe_id).where(RecipeIngredient.food_id == food_id).limit(1)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El alimento se usa en alguna receta",
+        )
+
+    # Comidas de otros usuarios con un alimento privado solo existen en
+    # datos anteriores a la comprobación del dueño en create_meal; borrarlo
+    # se llevaría su historial, igual que en DELETE /catalog/{id}
+    if await db.scalar(
+        select(Meal.id).where(Meal.food_id == food_id, Meal.user_id != current_user.id).limit(1)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El alimento está en comidas de otros usuarios",
+        )
+
+    if await db.scalar(select(Meal.id).where(Meal.food_id == food_id).limit(1)):
+        tasks.delete_food.enqueue(db, user_id=current_user.id, food_id=food_id)
+        await db.commit()
+        return Response(status_code=status.HTTP_202_ACCEPTED)
 
-    db.delete(db_food)
-    db.commit()
+    await db.execute(delete(Food).where(Food.id == food_id))
+    await db.commit()
+    await bump_version(current_user.id)
     return None
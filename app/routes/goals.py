@@ -1,21 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_async_db
 from app.models.goal import Goal
 from app.schemas.goal import GoalCreate, GoalOut
+from app.schemas.user import CurrentUser
+from app.utils.etag import bump_version, etag_for_current_user
 from app.utils.security import get_current_user
 
 router = APIRouter(prefix="/goals", tags=["Goals"])
 
 
-@router.get("/", response_model=GoalOut)
-def get_my_goal(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get(
+    "/",
+    response_model=GoalOut,
+    dependencies=[Depends(etag_for_current_user)],
+)
+async def get_my_goal(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    goal = db.query(Goal).filter(Goal.user_id == current_user.id).first()
+    goal = await db.scalar(select(Goal).where(Goal.user_id == current_user.id))
     if not goal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -25,12 +31,12 @@ def get_my_goal(
 
 
 @router.post("/", response_model=GoalOut, status_code=status.HTTP_201_CREATED)
-def create_or_update_goal(
+async def create_or_update_goal(
     goal: GoalCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    db_goal = db.query(Goal).filter(Goal.user_id == current_user.id).first()
+    db_goal = await db.scalar(select(Goal).where(Goal.user_id == current_user.id))
 
     if db_goal:
         # Actualizar
@@ -49,6 +55,7 @@ def create_or_update_goal(
         )
         db.add(db_goal)
 
-    db.commit()
-    db.refresh(db_goal)
+    await db.commit()
+    await bump_version(current_user.id)
+    await db.refresh(db_goal)
     return db_goal
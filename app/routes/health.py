@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.database import pool_stats
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """
+    Estado de los pools de conexiones: conexiones en uso, overflow,
+    checkouts y tiempo esperando una conexión libre.
+    """
+    return pool_stats()
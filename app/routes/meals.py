@@ -1,27 +1,42 @@
 from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.user import User
-from app.models.food import Food
+from app.config import settings
+from app.database import get_async_db
 from app.models.meal import Meal
-from app.schemas.meal import MealCreate, MealOut
+from app.schemas.meal import MealBulkCreate, MealBulkOut, MealCreate, MealOut
+from app.services import catalog, daily_totals, export
+from app.services import meals as meal_service
+from app.services.nutrition import snapshot
+from app.utils.etag import bump_version, etag_for_current_user
+from app.utils.pagination import paginate
+from app.utils.rate_limit import limit_by_user
+from app.utils.responses import rows_response
+from app.schemas.user import CurrentUser
 from app.utils.security import get_current_user
 
 router = APIRouter(prefix="/meals", tags=["Meals"])
 
 
+async def get_meal_row(db: AsyncSession, user_id: int, meal_id: int):
+    """Una comida del usuario con sus macros (ver meal_service.meal_rows), o None."""
+    result = await db.execute(meal_service.meal_rows(user_id).where(Meal.id == meal_id))
+    return result.one_or_none()
+
+
 @router.post("/", response_model=MealOut, status_code=status.HTTP_201_CREATED)
-def create_meal(
+async def create_meal(
     meal: MealCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    # Verificar que el alimento existe
-    food = db.query(Food).filter(Food.id == meal.food_id).first()
+    # Verificar que el alimento existe y es suyo o del catálogo global
+    food = await catalog.find_food(db, current_user.id, meal.food_id)
     if not food:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -33,75 +48,166 @@ def create_meal(
         food_id=meal.food_id,
         quantity=meal.quantity,
         date=meal.date or date.today(),
+        **snapshot(food, meal.quantity),
     )
 
     db.add(db_meal)
-    db.commit()
-    db.refresh(db_meal)
-    return db_meal
+    await db.run_sync(
+        daily_totals.add_meal, current_user.id, db_meal.date, food, db_meal.quantity
+    )
+    await db.commit()
+    await bump_version(current_user.id)
+    return await get_meal_row(db, current_user.id, db_meal.id)
+
+
+@router.post(
+    "/bulk",
+    response_model=MealBulkOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_user("bulk"))],
+)
+async def create_meals_bulk(
+    payload: MealBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Registra varias comidas en una sola petición (p.ej. todos los
+    alimentos de una cena). Los elementos con un alimento que no existe
+    se devuelven con status "error" y el resto se guarda igualmente.
+    """
+    results = await db.run_sync(
+        meal_service.bulk_create_meals, current_user.id, payload.items
+    )
+    await db.commit()
+    await bump_version(current_user.id)
+
+    created = sum(1 for result in results if result["status"] == "created")
+    return {
+        "created": created,
+        "errors": len(results) - created,
+        "results": results,
+    }
+
+
+@router.get("/export", dependencies=[Depends(limit_by_user("export"))])
+async def export_meals(
+    format: export.ExportFormat = Query(export.ExportFormat.ndjson),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Descarga el historial de comidas del usuario (con los macros de cada
+    comida) en NDJSON o CSV, opcionalmente entre dos fechas.
+    Se envía a medida que se lee, sin cargar todo el historial en memoria.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' no puede ser posterior a 'to'",
+        )
 
+    stmt = meal_service.export_query(current_user.id, date_from, date_to)
+    return StreamingResponse(
+        export.stream_rows(stmt, meal_service.EXPORT_FIELDS, format),
+        media_type=export.MEDIA_TYPES[format],
+        headers=export.content_disposition("meals", format),
+    )
 
-@router.get("/", response_model=List[MealOut])
-def list_meals(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+
+@router.get(
+    "/",
+    response_model=List[MealOut],
+    dependencies=[Depends(etag_for_current_user)],
+)
+async def list_meals(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
     day: Optional[date] = Query(None, description="Filtrar por fecha"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(50, ge=1, le=200, description="Tamaño de página"),
 ):
-    query = db.query(Meal).filter(Meal.user_id == current_user.id)
+    """
+    Comidas del usuario ordenadas por fecha, paginadas por cursor.
+    La cabecera X-Next-Cursor trae el `cursor` de la página siguiente.
+    """
+    stmt = meal_service.meal_rows(current_user.id)
     if day:
-        query = query.filter(Meal.date == day)
-    return query.all()
+        stmt = stmt.where(Meal.date == day)
+    rows = await paginate(db, stmt, [Meal.date, Meal.id], cursor, limit, response, as_rows=True)
+
+    if settings.fast_json_lists:
+        return rows_response(rows, meal_service.MEAL_FIELDS, response)
+    return rows
 
 
 @router.put("/{meal_id}", response_model=MealOut)
-def update_meal(
+async def update_meal(
     meal_id: int,
     meal: MealCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    db_meal = db.query(Meal).filter(
-        Meal.id == meal_id, Meal.user_id == current_user.id
-    ).first()
-    if not db_meal:
+    # La fila trae los macros de la comida antigua para quitarlos de los totales
+    old = await get_meal_row(db, current_user.id, meal_id)
+    if not old:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Registro de comida no encontrado",
         )
 
-    # Si se cambia el alimento, comprobar que existe
-    if meal.food_id != db_meal.food_id:
-        food = db.query(Food).filter(Food.id == meal.food_id).first()
-        if not food:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Alimento no encontrado",
-            )
+    # Comprobar que puede usar el alimento (suyo o del catálogo global)
+    food = await catalog.find_food(db, current_user.id, meal.food_id)
+    if not food:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alimento no encontrado",
+        )
 
-    db_meal.food_id = meal.food_id
-    db_meal.quantity = meal.quantity
-    db_meal.date = meal.date or db_meal.date
+    day = meal.date or old.date
+    await db.execute(
+        update(Meal)
+        .where(Meal.id == meal_id)
+        .values(
+            food_id=meal.food_id,
+            quantity=meal.quantity,
+            date=day,
+            **snapshot(food, meal.quantity),
+        )
+    )
 
-    db.commit()
-    db.refresh(db_meal)
-    return db_meal
+    # Quitar la comida antigua de los totales y sumar la nueva
+    await db.run_sync(
+        daily_totals.remove_macros, current_user.id, old.date, daily_totals.macros_of(old)
+    )
+    await db.run_sync(
+        daily_totals.add_meal, current_user.id, day, food, meal.quantity
+    )
+
+    await db.commit()
+    await bump_version(current_user.id)
+    return await get_meal_row(db, current_user.id, meal_id)
 
 
 @router.delete("/{meal_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_meal(
+async def delete_meal(
     meal_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    db_meal = db.query(Meal).filter(
-        Meal.id == meal_id, Meal.user_id == current_user.id
-    ).first()
-    if not db_meal:
+    old = await get_meal_row(db, current_user.id, meal_id)
+    if not old:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Registro de comida no encontrado",
         )
 
-    db.delete(db_meal)
-    db.commit()
+    await db.run_sync(
+        daily_totals.remove_macros, current_user.id, old.date, daily_totals.macros_of(old)
+    )
+    await db.execute(delete(Meal).where(Meal.id == meal_id))
+    await db.commit()
+    await bump_version(current_user.id)
     return None
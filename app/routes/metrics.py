@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.database import pool_stats
+from app.utils.request_metrics import render_prometheus
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Métricas en formato Prometheus: latencia, tiempo en BD y sentencias
+    por ruta, consultas lentas y estado de los pools de conexiones.
+    Cada worker expone las suyas.
+    """
+    return PlainTextResponse(
+        render_prometheus(pool_stats()),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,200 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.food import Food, RecipeIngredient
+from app.models.meal import Meal
+from app.schemas.food import FoodOut
+from app.schemas.recipe import RecipeCreate, RecipeOut
+from app.schemas.user import CurrentUser
+from app.services import daily_totals, recipes, tasks
+from app.services.nutrition import MACROS
+from app.utils.etag import bump_version, etag_for_current_user
+from app.utils.pagination import paginate
+from app.utils.security import get_current_user
+
+router = APIRouter(prefix="/recipes", tags=["Recipes"])
+
+
+async def get_own_recipe(db: AsyncSession, user_id: int, recipe_id: int) -> Food:
+    recipe = await db.scalar(
+        select(Food).where(
+            Food.id == recipe_id, Food.user_id == user_id, Food.is_recipe.is_(True)
+        )
+    )
+    if not recipe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Receta no encontrada",
+        )
+    return recipe
+
+
+async def ensure_name_free(db: AsyncSession, user_id: int, name: str):
+    name_in_use = await db.scalar(
+        select(Food.id).where(Food.user_id == user_id, Food.name == name)
+    )
+    if name_in_use:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ya tienes un alimento o receta con ese nombre",
+        )
+
+
+async def load_ingredients(db: AsyncSession, user_id: int, recipe: RecipeCreate):
+    """
+    Comprueba los ingredientes (alimentos propios o globales, no recetas) y
+    devuelve ({food_id: gramos}, macros por 100 g). Un alimento repetido
+    suma sus gramos.
+    """
+    grams = {}
+    for ingredient in recipe.ingredients:
+        grams[ingredient.food_id] = grams.get(ingredient.food_id, 0) + ingredient.grams
+
+    foods = {
+        food.id: food
+        for food in await db.execute(
+            select(Food.id, *[getattr(Food, m) for m in MACROS]).where(
+                Food.id.in_(grams),
+                or_(Food.user_id == user_id, Food.user_id.is_(None)),
+                Food.is_recipe.is_(False),
+            )
+        )
+    }
+    missing = sorted(set(grams) - set(foods))
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ingredientes no válidos (no existen o son recetas): {missing}",
+        )
+
+    macros = recipes.macros_per_100g([(foods[food_id], g) for food_id, g in grams.items()])
+    return grams, macros
+
+
+async def recipe_out(db: AsyncSession, recipe: Food) -> dict:
+    ingredients = (
+        await db.execute(
+            select(RecipeIngredient.food_id, Food.name, RecipeIngredient.grams)
+            .join(Food, Food.id == RecipeIngredient.food_id)
+            .where(RecipeIngredient.recipe_id == recipe.id)
+            .order_by(RecipeIngredient.grams.desc())
+        )
+    ).all()
+    return {
+        **FoodOut.from_orm(recipe).dict(),
+        "total_grams": sum(ingredient.grams for ingredient in ingredients),
+        "ingredients": ingredients,
+    }
+
+
+@router.get(
+    "/",
+    response_model=List[FoodOut],
+    dependencies=[Depends(etag_for_current_user)],
+)
+async def list_recipes(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(20, ge=1, le=100, description="Tamaño de página"),
+):
+    """
+    Recetas del usuario, ordenadas por nombre. Las recetas también salen
+    en GET /foods/ (con is_recipe = true) y se registran como un alimento
+    más en POST /meals/.
+    """
+    stmt = select(Food).where(Food.user_id == current_user.id, Food.is_recipe.is_(True))
+    return await paginate(db, stmt, [Food.name, Food.id], cursor, limit, response)
+
+
+@router.get(
+    "/{recipe_id}",
+    response_model=RecipeOut,
+    dependencies=[Depends(etag_for_current_user)],
+)
+async def get_recipe(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    recipe = await get_own_recipe(db, current_user.id, recipe_id)
+    return await recipe_out(db, recipe)
+
+
+@router.post("/", response_model=RecipeOut, status_code=status.HTTP_201_CREATED)
+async def create_recipe(
+    recipe: RecipeCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Crea una receta a partir de alimentos propios o del catálogo con sus
+    gramos. Sus macros por 100 g se calculan al guardarla.
+    """
+    await ensure_name_free(db, current_user.id, recipe.name)
+    grams, macros = await load_ingredients(db, current_user.id, recipe)
+
+    db_recipe = Food(name=recipe.name, user_id=current_user.id, is_recipe=True, **macros)
+    db.add(db_recipe)
+    await db.flush()
+    await db.run_sync(recipes.set_ingredients, db_recipe.id, grams)
+
+    await db.commit()
+    await bump_version(current_user.id)
+    return await recipe_out(db, db_recipe)
+
+
+@router.put("/{recipe_id}", response_model=RecipeOut)
+async def update_recipe(
+    recipe_id: int,
+    recipe: RecipeCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Cambia el nombre o los ingredientes de una receta. Las comidas ya
+    registradas con ella pasan a contar con los macros nuevos (los totales
+    se recalculan en segundo plano).
+    """
+    db_recipe = await get_own_recipe(db, current_user.id, recipe_id)
+    if recipe.name != db_recipe.name:
+        await ensure_name_free(db, current_user.id, recipe.name)
+    grams, macros = await load_ingredients(db, current_user.id, recipe)
+
+    old_macros = daily_totals.macros_of(db_recipe)
+    db_recipe.name = recipe.name
+    for m, value in macros.items():
+        setattr(db_recipe, m, value)
+
+    await db.run_sync(recipes.set_ingredients, db_recipe.id, grams)
+    if macros != old_macros:
+        tasks.refresh_foods.enqueue(db, food_ids=[db_recipe.id])
+
+    await db.commit()
+    await bump_version(current_user.id)
+    return await recipe_out(db, db_recipe)
+
+
+@router.delete("/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_recipe(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    db_recipe = await get_own_recipe(db, current_user.id, recipe_id)
+    if await db.scalar(select(Meal.id).where(Meal.food_id == recipe_id).limit(1)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La receta está en comidas registradas",
+        )
+
+    await db.execute(delete(RecipeIngredient).where(RecipeIngredient.recipe_id == recipe_id))
+    await db.delete(db_recipe)
+    await db.commit()
+    await bump_version(current_user.id)
+    return None
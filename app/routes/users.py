@@ -1,43 +1,45 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi import Query
-from datetime import date
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User
-from app.schemas.user import UserCreate, UserOut, UserUpdate
-from app.models.meal import Meal
-from app.models.food import Food
-from sqlalchemy import Date
-
-from app.utils.security import get_current_user, hash_password
+from datetime import date, datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.user import AccountDeletion, User
+from app.schemas.user import CurrentUser, UserCreate, UserOut, UserUpdate
+from app.models.goal import Goal
+from app.services import summary as summary_service
+from app.services import tasks
+
+from app.utils.etag import etag_for_path_user
+from app.utils.pagination import paginate
+from app.utils.passwords import password_hasher
+from app.utils.security import ensure_admin, get_current_user, revoke_tokens
+from app.utils.token_state import REVOKED
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-@router.get("/", response_model=list[UserOut])
-def list_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
-
-
-
 @router.put("/{user_id}", response_model=UserOut)
 @router.patch("/{user_id}", response_model=UserOut)
-def upate_user(
+async def upate_user(
     user_id: int,
     payload: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     # Solo puede modificar el propio usuario
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="No autorizado")
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    user = await db.get(User, user_id)
+    # Una cuenta dada de baja sigue en users mientras se borran sus datos
+    if not user or user.deleted_at is not None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
     if payload.email:
-        exists = db.query(User).filter(User.email == payload.email, User.id != user_id).first()
+        exists = await db.scalar(
+            select(User).where(User.email == payload.email, User.id != user_id)
+        )
         if exists:
             raise HTTPException(status_code=400, detail="El email ya está en uso")
         user.email = payload.email
@@ -46,166 +48,138 @@ def upate_user(
         user.name = payload.name
 
     if payload.password:
-        user.password_hash = hash_password(payload.password)
+        user.password_hash = await password_hasher.hash(payload.password)
+        # Los tokens emitidos con la contraseña anterior dejan de valer
+        user.token_version += 1
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    await revoke_tokens(user_id, user.token_version)
     return user
 
 @router.delete("/{user_id}", status_code=204)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="No autorizado")
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    # FOR UPDATE: dos bajas a la vez no pueden pasar ambas la comprobación
+    user = await db.get(User, user_id, with_for_update=True)
+    # Una cuenta dada de baja sigue en users mientras se borran sus datos
+    if not user or user.deleted_at is not None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    
-    db.delete(user)
-    db.commit()
+
+    # La cuenta queda dada de baja ya (sin login ni tokens válidos);
+    # comidas, alimentos y el propio usuario se borran por tramos en
+    # segundo plano
+    user.deleted_at = datetime.utcnow()
+    user.token_version += 1
+    db.add(AccountDeletion(user_id=user_id))
+    tasks.delete_user.enqueue(db, user_id=user_id)
+    await db.commit()
+    await revoke_tokens(user_id, REVOKED)
     # TODO Devolver un json con una info de funciona
     return
 
 
-def ensure_admin(current_user: User):
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permisos para realizar esta operación",
-        )
-
-
 @router.get("/", response_model=List[UserOut])
-def list_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_users(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(50, ge=1, le=200, description="Tamaño de página"),
 ):
     ensure_admin(current_user)
-    users = db.query(User).all()
-    return users
+    stmt = select(User).where(User.deleted_at.is_(None))
+    return await paginate(db, stmt, [User.id], cursor, limit, response)
 
 
 @router.get("/me", response_model=UserOut)
-def get_me(current_user: User = Depends(get_current_user)):
-    return current_user
+async def get_me(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # Si current_user viene de los claims del token no trae name/email
+    if current_user.email:
+        return current_user
+    return await db.get(User, current_user.id)
 
-@router.get("/{user_id}/summary")
-def get_daily_summary(
+@router.get("/{user_id}/summary", dependencies=[Depends(etag_for_path_user)])
+async def get_daily_summary(
     user_id: int,
     date_param: date = Query(..., alias="date"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Buscar comidas del usuario en esa fecha
-    meals = (
-        db.query(Meal)
-        .filter(Meal.user_id == user_id)
-        .filter(Meal.date.cast(Date) == date_param)
-        .all()
-    )
-
-    if not meals:
-        return {
-            "date": date_param,
-            "user_id": user_id,
-            "total_calories": 0,
-            "total_protein": 0,
-            "total_carbs": 0,
-            "total_fat": 0,
-            "meals": []
-        }
-
-    total_calories = 0
-    total_protein = 0
-    total_carbs = 0
-    total_fat = 0
-    meal_details = []
-
-    for meal in meals:
-        food = meal.food
-        q = meal.quantity / 100  # los datos nutricionales son por 100g
-
-        total_calories += food.calories * q
-        total_protein += food.protein * q
-        total_carbs += food.carbs * q
-        total_fat += food.fat * q
-
-        meal_details.append({
-            "food": food.name,
-            "quantity": meal.quantity,
-            "calories": food.calories * q
-        })
+    summary = await db.run_sync(summary_service.get_daily_summary, user_id, date_param)
 
     return {
         "date": date_param,
         "user_id": user_id,
-        "total_calories": round(total_calories, 2),
-        "total_protein": round(total_protein, 2),
-        "total_carbs": round(total_carbs, 2),
-        "total_fat": round(total_fat, 2),
-        "meals": meal_details
+        **summary,
     }
 
-@router.get("/{user_id}/summary2")
-def get_daily_summary2(
+@router.get("/{user_id}/summary2", dependencies=[Depends(etag_for_path_user)])
+async def get_daily_summary2(
     user_id: int,
     date_param: date = Query(..., alias="date"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    meals = (
-        db.query(Meal)
-        .filter(Meal.user_id == user_id)
-        .filter(Meal.date.cast(Date) == date_param)
-        .all()
-    )
+    summary = await db.run_sync(summary_service.get_daily_summary, user_id, date_param)
 
-    if not meals:
-        return {
-            "date": date_param,
-            "user_id": user_id,
-            "total_calories": 0,
-            "total_protein": 0,
-            "total_carbs": 0,
-            "total_fat": 0,
-            "meals": [],
-            "message": "No se han registrado comidas ese día"
-        }
-
-    total_calories = 0
-    total_protein = 0
-    total_carbs = 0
-    total_fat = 0
-    meal_details = []
-
-    for meal in meals:
-        food = meal.food
-        q = meal.quantity / 100 
-
-        total_calories += food.calories * q
-        total_protein += food.protein * q
-        total_carbs += food.carbs * q
-        total_fat += food.fat * q
-
-        meal_details.append({
-            "food": food.name,
-            "quantity": meal.quantity,
-            "calories": round(food.calories * q, 2)
-        })
+    response = {
+        "date": date_param,
+        "user_id": user_id,
+        **summary,
+    }
+
+    if not summary["meals"]:
+        response["message"] = "No se han registrado comidas ese día"
+        return response
 
     # Intentar obtener los objetivos del usuario
-    goal = db.query(Goal).filter(Goal.user_id == user_id).first()
+    goal = await db.scalar(select(Goal).where(Goal.user_id == user_id))
+
+    if goal:
+        response.update({
+            "target_calories": goal.calories,
+            "target_protein": goal.protein,
+            "target_carbs": goal.carbs,
+            "target_fat": goal.fat,
+            "status": summary_service.goal_status(summary, goal),
+        })
+
+    return response
+
+@router.get("/{user_id}/summary/range", dependencies=[Depends(etag_for_path_user)])
+async def get_range_summary(
+    user_id: int,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    granularity: summary_service.Granularity = Query(summary_service.Granularity.day),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Resumen de un rango de fechas agrupado por día, semana o mes.
+    Sustituye a pedir /summary día a día para pintar una semana o un mes.
+    """
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' no puede ser posterior a 'to'")
+
+    goal = await db.scalar(select(Goal).where(Goal.user_id == user_id))
+    buckets = await db.run_sync(
+        summary_service.get_range_summary, user_id, date_from, date_to, granularity, goal
+    )
 
     response = {
-        "date": date_param,
         "user_id": user_id,
-        "total_calories": round(total_calories, 2),
-        "total_protein": round(total_protein, 2),
-        "total_carbs": round(total_carbs, 2),
-        "total_fat": round(total_fat, 2),
-        "meals": meal_details
+        "from": date_from,
+        "to": date_to,
+        "granularity": granularity,
+        "buckets": buckets,
     }
 
     if goal:
@@ -214,12 +188,6 @@ def get_daily_summary2(
             "target_protein": goal.protein,
             "target_carbs": goal.carbs,
             "target_fat": goal.fat,
-            "status": {
-                "calories": "✅" if total_calories <= goal.calories else "❌",
-                "protein": "✅" if total_protein >= goal.protein else "❌",
-                "carbs": "✅" if total_carbs <= goal.carbs else "❌",
-                "fat": "✅" if total_fat <= goal.fat else "❌"
-            }
         })
 
-    return response
\ No newline at end of file
+    return response
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel
 
 class FoodBase(BaseModel):
@@ -12,6 +14,19 @@ class FoodCreate(FoodBase):
 
 class FoodOut(FoodBase):
     id: int
+    is_global: bool = False  # del catálogo común, no editable por el usuario
+    is_recipe: bool = False  # receta: macros por 100 g calculados de sus ingredientes
 
     class Config:
-        orm_model = True
\ No newline at end of file
+        orm_mode = True
+
+class FoodImportError(BaseModel):
+    line: int
+    detail: str
+
+class FoodImportOut(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    failed: int
+    errors: List[FoodImportError]
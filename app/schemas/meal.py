@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, conlist
+import datetime
 from datetime import date
 
 class MealBase(BaseModel):
@@ -7,7 +9,8 @@ class MealBase(BaseModel):
     quantity: float
 
 class MealCreate(MealBase):
-    pass
+    # Si no se indica, se usa la fecha de hoy
+    date: Optional[datetime.date] = None
 
 class MealUpdate(BaseModel):
     food_id: int
@@ -17,6 +20,7 @@ class MealUpdate(BaseModel):
 class MealOut(MealBase):
     id: int
     user_id: int
+    date: datetime.date
     food_id: int
     quantity: float
     calories: float
@@ -34,3 +38,23 @@ class MealSummary(BaseModel):
     protein: float
     carbs: float
     fat: float
+
+
+class MealBulkItem(BaseModel):
+    food_id: int
+    quantity: float
+    date: Optional[datetime.date] = None
+
+class MealBulkCreate(BaseModel):
+    items: conlist(MealBulkItem, min_items=1, max_items=100)
+
+class MealBulkResult(BaseModel):
+    index: int
+    status: str  # "created" | "error"
+    detail: Optional[str] = None
+    meal: Optional[MealOut] = None
+
+class MealBulkOut(BaseModel):
+    created: int
+    errors: int
+    results: List[MealBulkResult]
@@ -0,0 +1,26 @@
+from typing import List
+
+from pydantic import BaseModel, confloat, conlist
+
+from app.schemas.food import FoodOut
+
+class RecipeIngredientIn(BaseModel):
+    food_id: int
+    grams: confloat(gt=0)
+
+class RecipeCreate(BaseModel):
+    name: str
+    ingredients: conlist(RecipeIngredientIn, min_items=1, max_items=50)
+
+class RecipeIngredientOut(BaseModel):
+    food_id: int
+    name: str
+    grams: float
+
+    class Config:
+        orm_mode = True
+
+class RecipeOut(FoodOut):
+    # Para registrar la receta entera, quantity = total_grams
+    total_grams: float
+    ingredients: List[RecipeIngredientOut]
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 
 class UserBase(BaseModel):
@@ -16,4 +17,20 @@ class UserOut(UserBase):
     id: int
 
     class Config:
-        orm_model = True
\ No newline at end of file
+        orm_mode = True
+
+class CurrentUser(BaseModel):
+    """
+    Lo que las rutas necesitan del usuario autenticado.
+    Sale de la caché de usuarios o de los claims del token; name/email
+    pueden faltar si viene de los claims.
+    """
+    id: int
+    role: str
+    token_version: int = 0
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+        allow_mutation = False
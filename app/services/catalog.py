@@ -0,0 +1,174 @@
+import time
+from bisect import bisect_right
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.database import dialect_insert
+from app.models.food import CatalogMeta, Food
+from app.services.nutrition import MACROS
+
+CATALOG_META_ID = 1
+
+
+class FoodScope(str, Enum):
+    all = "all"  # los del usuario y los globales que no tapa
+    mine = "mine"
+    global_ = "global"
+
+
+class CatalogFood(NamedTuple):
+    """Alimento global en memoria; se serializa igual que un Food (FoodOut)."""
+    id: int
+    name: str
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
+    user_id: Optional[int] = None
+    is_global: bool = True
+    is_recipe: bool = False  # las recetas son siempre de un usuario
+
+
+class Catalog(NamedTuple):
+    """Foto inmutable del catálogo global en una versión."""
+    version: int
+    by_id: Dict[int, CatalogFood]
+    by_name: Dict[str, CatalogFood]
+    ordered: List[CatalogFood]  # por (name, id), para paginar
+    keys: List[tuple]
+
+    def page(self, after: Optional[tuple], limit: int) -> List[CatalogFood]:
+        """Igual que paginate(): las filas con (name, id) > after."""
+        start = bisect_right(self.keys, tuple(after)) if after else 0
+        return self.ordered[start:start + limit + 1]
+
+
+EMPTY = Catalog(-1, {}, {}, [], [])
+
+
+class CatalogCache:
+    """
+    Caché de lectura del catálogo global en cada proceso.
+
+    Mientras no pase `check_interval` desde la última comprobación se
+    responde sin tocar la base de datos. Después se lee la versión de
+    catalog_meta (una fila) y solo si ha cambiado se recargan los
+    alimentos. Las escrituras de este proceso llaman a invalidate()
+    para verlas en la siguiente lectura; las de otros procesos se ven
+    como mucho `check_interval` segundos después.
+    """
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self._check_interval = check_interval
+        self._catalog = EMPTY
+        self._checked_at = None
+
+    @property
+    def check_interval(self) -> float:
+        # Sin valor propio se usa CATALOG_CHECK_INTERVAL
+        if self._check_interval is None:
+            return settings.catalog_check_interval
+        return self._check_interval
+
+    async def get(self, db: AsyncSession) -> Catalog:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._catalog
+
+        # Se marca antes de ir a la BD para que las peticiones concurrentes
+        # sigan usando la foto actual en lugar de comprobar todas a la vez
+        self._checked_at = now
+        try:
+            version = await db.scalar(
+                select(CatalogMeta.version).where(CatalogMeta.id == CATALOG_META_ID)
+            ) or 0
+            if version != self._catalog.version:
+                self._catalog = await self._load(db, version)
+        except Exception:
+            self._checked_at = None
+            raise
+        return self._catalog
+
+    async def _load(self, db: AsyncSession, version: int) -> Catalog:
+        rows = await db.execute(
+            select(Food.id, Food.name, *[getattr(Food, m) for m in MACROS])
+            .where(Food.user_id.is_(None))
+            .order_by(Food.name, Food.id)
+        )
+        ordered = [CatalogFood(*row) for row in rows]
+        return Catalog(
+            version=version,
+            by_id={food.id: food for food in ordered},
+            by_name={food.name: food for food in ordered},
+            ordered=ordered,
+            keys=[(food.name, food.id) for food in ordered],
+        )
+
+    def invalidate(self):
+        self._checked_at = None
+
+    def clear(self):
+        self._catalog = EMPTY
+        self._checked_at = None
+
+
+catalog_cache = CatalogCache()
+
+
+async def bump_version(db: AsyncSession):
+    """Marca el catálogo como cambiado. Va en la misma transacción que el cambio."""
+    stmt = dialect_insert(db, CatalogMeta).values(id=CATALOG_META_ID, version=1)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[CatalogMeta.id],
+            set_={"version": CatalogMeta.version + 1},
+        )
+    )
+
+
+def visible_to(user_id: int, scope: FoodScope = FoodScope.all):
+    """
+    Condición WHERE para los alimentos que ve un usuario. Con scope=all
+    son los suyos y los globales que no tapa con uno propio del mismo
+    nombre.
+    """
+    if scope == FoodScope.mine:
+        return Food.user_id == user_id
+    if scope == FoodScope.global_:
+        return Food.user_id.is_(None)
+
+    own = aliased(Food)
+    shadowed = exists().where(own.user_id == user_id, own.name == Food.name)
+    return or_(
+        Food.user_id == user_id,
+        and_(Food.user_id.is_(None), ~shadowed),
+    )
+
+
+async def find_food(db: AsyncSession, user_id: int, food_id: int):
+    """
+    Alimento que puede usar el usuario (suyo o global), o None.
+    Los globales salen de la caché sin consultar la BD; uno global que aún
+    no está en ella (creado en otro proceso hace menos de
+    CATALOG_CHECK_INTERVAL) se busca en la BD como los propios.
+    """
+    catalog = await catalog_cache.get(db)
+    food = catalog.by_id.get(food_id)
+    if food is not None:
+        return food
+    result = await db.execute(
+        select(
+            Food.id,
+            Food.name,
+            *[getattr(Food, m) for m in MACROS],
+            Food.user_id,
+            Food.user_id.is_(None).label("is_global"),
+            Food.is_recipe,
+        ).where(Food.id == food_id, or_(Food.user_id == user_id, Food.user_id.is_(None)))
+    )
+    return result.one_or_none()
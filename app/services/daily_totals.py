@@ -0,0 +1,181 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import and_, delete, func, or_, select, tuple_
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.database import dialect_insert
+from app.models.daily_total import DailyTotal
+from app.models.meal import Meal
+from app.services.nutrition import MACROS, meal_macro, with_food
+
+# Margen para comparar sumas en coma flotante
+TOLERANCE = 0.01
+
+
+def macros_of(obj) -> dict:
+    return {m: getattr(obj, m) for m in MACROS}
+
+
+def apply_delta(db: Session, user_id: int, day: date, delta: dict, meal_count: int):
+    """
+    Suma un delta a la fila (user_id, date), creándola si no existe.
+    Es un único INSERT ... ON CONFLICT DO UPDATE dentro de la transacción
+    de la petición.
+    """
+    stmt = dialect_insert(db, DailyTotal).values(
+        user_id=user_id, date=day, meal_count=meal_count, **delta
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyTotal.user_id, DailyTotal.date],
+        set_={
+            "meal_count": DailyTotal.meal_count + meal_count,
+            **{m: getattr(DailyTotal, m) + delta[m] for m in MACROS},
+        },
+    )
+    db.execute(stmt)
+
+    if meal_count < 0:
+        # Un día sin comidas no necesita fila
+        db.execute(
+            delete(DailyTotal).where(
+                DailyTotal.user_id == user_id,
+                DailyTotal.date == day,
+                DailyTotal.meal_count <= 0,
+            )
+        )
+
+
+def add_meal(db: Session, user_id: int, day: date, food, quantity: float):
+    delta = {m: getattr(food, m) * quantity / 100 for m in MACROS}
+    apply_delta(db, user_id, day, delta, 1)
+
+
+def remove_meal(db: Session, user_id: int, day: date, food, quantity: float):
+    delta = {m: -getattr(food, m) * quantity / 100 for m in MACROS}
+    apply_delta(db, user_id, day, delta, -1)
+
+
+def remove_macros(db: Session, user_id: int, day: date, macros: dict):
+    """Como remove_meal, con los macros de la comida ya calculados (meal_rows)."""
+    apply_delta(db, user_id, day, {m: -macros[m] for m in MACROS}, -1)
+
+
+def refresh_food_days(db: Session, food_ids: list) -> int:
+    """
+    Regenera las filas de daily_totals de los días (usuario, fecha) en que
+    se comió alguno de los alimentos, desde meals. Es lo que hay que hacer
+    tras cambiar sus macros; como no suma deltas, repetirlo da lo mismo
+    (ver app/services/tasks.py). Devuelve las filas escritas.
+
+    Con MEAL_SNAPSHOTS las comidas conservan sus macros y no hay nada que
+    regenerar.
+    """
+    if settings.meal_snapshots or not food_ids:
+        return 0
+
+    eaten = aliased(Meal)
+    days = select(eaten.user_id, eaten.date).where(eaten.food_id.in_(food_ids)).distinct()
+    return refresh_days(db, days)
+
+
+def refresh_days(db: Session, days) -> int:
+    """
+    Regenera desde meals las filas de daily_totals de unos días: una lista
+    de (user_id, date) o un SELECT de esas dos columnas. Los días que se
+    han quedado sin comidas pierden su fila. Devuelve las filas escritas.
+    """
+    if isinstance(days, list) and not days:
+        return 0
+
+    db.execute(delete(DailyTotal).where(tuple_(DailyTotal.user_id, DailyTotal.date).in_(days)))
+    result = db.execute(
+        dialect_insert(db, DailyTotal).from_select(
+            ["user_id", "date", *MACROS, "meal_count"],
+            _raw_totals().where(tuple_(Meal.user_id, Meal.date).in_(days)),
+        )
+    )
+    return result.rowcount
+
+
+def _raw_totals(user_id: Optional[int] = None):
+    """
+    Totales por (usuario, día) calculados desde meals JOIN foods, o solo
+    desde meals con MEAL_SNAPSHOTS.
+    """
+    query = with_food(
+        select(
+            Meal.user_id,
+            Meal.date,
+            *[func.sum(meal_macro(m)).label(m) for m in MACROS],
+            func.count(Meal.id).label("meal_count"),
+        )
+    ).group_by(Meal.user_id, Meal.date)
+    if user_id is not None:
+        query = query.where(Meal.user_id == user_id)
+    return query
+
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Regenera la tabla (o solo las filas de un usuario) desde los datos
+    originales con un INSERT ... SELECT. Devuelve las filas escritas.
+    """
+    clear = delete(DailyTotal)
+    if user_id is not None:
+        clear = clear.where(DailyTotal.user_id == user_id)
+    db.execute(clear)
+
+    result = db.execute(
+        dialect_insert(db, DailyTotal).from_select(
+            ["user_id", "date", *MACROS, "meal_count"], _raw_totals(user_id)
+        )
+    )
+    return result.rowcount
+
+
+def check(db: Session, user_id: Optional[int] = None) -> list:
+    """
+    Compara daily_totals con los datos originales y devuelve las
+    diferencias: días que faltan, sobran o no cuadran.
+    """
+    raw = _raw_totals(user_id).subquery()
+
+    same_key = and_(DailyTotal.user_id == raw.c.user_id, DailyTotal.date == raw.c.date)
+    differs = or_(
+        DailyTotal.user_id.is_(None),
+        DailyTotal.meal_count != raw.c.meal_count,
+        *[func.abs(getattr(DailyTotal, m) - getattr(raw.c, m)) > TOLERANCE for m in MACROS],
+    )
+    missing_or_wrong = (
+        select(raw, *[getattr(DailyTotal, m).label(f"stored_{m}") for m in MACROS])
+        .outerjoin(DailyTotal, same_key)
+        .where(differs)
+    )
+
+    orphans = select(DailyTotal).outerjoin(raw, same_key).where(raw.c.user_id.is_(None))
+    if user_id is not None:
+        orphans = orphans.where(DailyTotal.user_id == user_id)
+
+    problems = []
+    for row in db.execute(missing_or_wrong):
+        stored = None
+        if row.stored_calories is not None:
+            stored = {m: getattr(row, f"stored_{m}") for m in MACROS}
+        problems.append({
+            "user_id": row.user_id,
+            "date": row.date,
+            "expected": {m: getattr(row, m) for m in MACROS},
+            "stored": stored,
+        })
+
+    for total in db.execute(orphans).scalars():
+        problems.append({
+            "user_id": total.user_id,
+            "date": total.date,
+            "expected": None,
+            "stored": macros_of(total),
+        })
+
+    return problems
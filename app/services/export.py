@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from enum import Enum
+
+from sqlalchemy import Select
+
+from app.database import engines
+
+# Filas que se leen del cursor del servidor y se envían de una vez
+CHUNK_SIZE = 500
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def encode_ndjson(rows, fields: list) -> str:
+    return "".join(
+        json.dumps({f: row[f] for f in fields}, default=str, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def encode_csv(rows, fields: list, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    writer.writerows([row[f] for f in fields] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_rows(stmt: Select, fields: list, fmt: ExportFormat):
+    """
+    Generador para StreamingResponse: recorre la consulta con un cursor
+    del servidor (yield_per) y va emitiendo bloques de CHUNK_SIZE filas,
+    así la memoria no crece con el tamaño del resultado.
+
+    Abre su propia sesión: la de get_async_db ya está cerrada cuando
+    StreamingResponse empieza a consumir el generador.
+    """
+    if fmt == ExportFormat.csv:
+        yield encode_csv([], fields, header=True)
+
+    async with engines().AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=CHUNK_SIZE))
+        async for partition in result.mappings().partitions():
+            if fmt == ExportFormat.csv:
+                yield encode_csv(partition, fields)
+            else:
+                yield encode_ndjson(partition, fields)
+
+
+def content_disposition(name: str, fmt: ExportFormat) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'}
@@ -0,0 +1,154 @@
+import csv
+import json
+from enum import Enum
+from typing import Callable, Iterable, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.food import Food
+from app.schemas.food import FoodCreate
+from app.services import daily_totals, tasks
+from app.services.nutrition import MACROS
+
+BATCH_SIZE = 500
+
+# Como mucho se devuelven estos errores; el resto solo se cuentan
+MAX_ERRORS = 100
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class OnDuplicate(str, Enum):
+    skip = "skip"
+    update = "update"
+
+
+def guess_format(filename: Optional[str]) -> ImportFormat:
+    if filename and filename.lower().endswith(".csv"):
+        return ImportFormat.csv
+    return ImportFormat.ndjson
+
+
+def iter_records(lines: Iterable[str], fmt: ImportFormat) -> Iterator[tuple]:
+    """
+    Lee el fichero línea a línea y devuelve (línea, dict) sin cargarlo
+    entero. Una línea NDJSON que no es JSON válido sale como (línea, None).
+    """
+    if fmt == ImportFormat.csv:
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_num, record if isinstance(record, dict) else None
+
+
+def import_foods(
+    db: Session,
+    user_id: int,
+    records: Iterable[tuple],
+    on_duplicate: OnDuplicate = OnDuplicate.skip,
+    batch_size: int = BATCH_SIZE,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Importa alimentos del usuario en lotes de INSERT ... ON CONFLICT
+    sobre (user_id, name).
+
+    Los nombres que ya tiene el usuario se cargan UNA vez al principio,
+    así se sabe sin más consultas qué filas son nuevas, cuáles repetidas
+    y, con on_duplicate=update, qué macros han cambiado (sus días se
+    recalculan en segundo plano). Un nombre repetido dentro del propio fichero cuenta
+    como saltado.
+
+    `progress` se llama después de cada lote con el resumen parcial.
+    No hace commit.
+    """
+    existing = {
+        row.name: row
+        for row in db.execute(
+            select(Food.id, Food.name, Food.is_recipe, *[getattr(Food, m) for m in MACROS])
+            .where(Food.user_id == user_id)
+        )
+    }
+    seen = set()
+    stats = {"created": 0, "updated": 0, "skipped": 0, "failed": 0, "errors": []}
+    batch, changed = [], []
+
+    def flush():
+        if not batch:
+            return
+        stmt = dialect_insert(db, Food).values(batch)
+        if on_duplicate == OnDuplicate.update:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Food.user_id, Food.name],
+                set_={m: getattr(stmt.excluded, m) for m in MACROS},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Food.user_id, Food.name])
+        db.execute(stmt)
+
+        if changed:
+            # Días y recetas que usan los alimentos cambiados, en segundo plano
+            tasks.refresh_foods.enqueue(db, food_ids=list(changed))
+
+        batch.clear()
+        changed.clear()
+        if progress:
+            progress(stats)
+
+    for line_num, record in records:
+        try:
+            if record is None:
+                raise ValueError("JSON no válido")
+            food = FoodCreate(**record)
+        except (ValidationError, ValueError, TypeError) as e:
+            stats["failed"] += 1
+            if len(stats["errors"]) < MAX_ERRORS:
+                stats["errors"].append({"line": line_num, "detail": str(e)})
+            continue
+
+        if food.name in seen:
+            stats["skipped"] += 1
+            continue
+        seen.add(food.name)
+
+        current = existing.get(food.name)
+        if current is not None and current.is_recipe and on_duplicate == OnDuplicate.update:
+            # Los macros de una receta salen de sus ingredientes
+            stats["failed"] += 1
+            if len(stats["errors"]) < MAX_ERRORS:
+                stats["errors"].append(
+                    {"line": line_num, "detail": f"'{food.name}' es una receta"}
+                )
+            continue
+        if current is not None:
+            old = daily_totals.macros_of(current)
+            new = {m: getattr(food, m) for m in MACROS}
+            if on_duplicate == OnDuplicate.skip or old == new:
+                stats["skipped"] += 1
+                continue
+            changed.append(current.id)
+            stats["updated"] += 1
+        else:
+            stats["created"] += 1
+
+        batch.append({"user_id": user_id, **food.dict()})
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    return stats
@@ -0,0 +1,94 @@
+from sqlalchemy import case, column, func, or_, table
+from sqlalchemy.orm import Session
+
+from app.models.food import Food
+from app.services.catalog import FoodScope, visible_to
+
+# Tabla FTS5 de SQLite (ver app/models/food.py); la columna oculta con el
+# nombre de la tabla es la que admite MATCH
+foods_fts = table("foods_fts", column("rowid"), column("rank"), column("foods_fts"))
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_query(term: str) -> str:
+    # Cada palabra como prefijo: "pla ma" -> "pla"* "ma"*
+    words = [w.replace('"', '""') for w in term.split()]
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search_foods(
+    db: Session, user_id: int, term: str, limit: int, scope: FoodScope = FoodScope.all
+) -> list:
+    """
+    Busca alimentos visibles para el usuario (ver catalog.visible_to)
+    por nombre, ordenados por relevancia:
+    primero los que empiezan por el término, luego los que tienen una
+    palabra que empieza por él y después por similitud.
+
+    PostgreSQL usa el índice GIN de pg_trgm; SQLite (tests) usa FTS5.
+    """
+    term = term.strip()
+    if not term:
+        return []
+
+    visible = visible_to(user_id, scope)
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return _search_trgm(db, visible, term, limit)
+    if dialect == "sqlite":
+        return _search_fts(db, visible, term, limit)
+    return _search_like(db, visible, term, limit)
+
+
+def _prefix_rank(term: str):
+    pattern = _escape_like(term)
+    return case(
+        (Food.name.ilike(f"{pattern}%", escape="\\"), 0),
+        (Food.name.ilike(f"% {pattern}%", escape="\\"), 1),
+        else_=2,
+    )
+
+
+def _search_trgm(db: Session, visible, term: str, limit: int) -> list:
+    pattern = _escape_like(term)
+    return (
+        db.query(Food)
+        .filter(visible)
+        .filter(
+            or_(
+                Food.name.ilike(f"%{pattern}%", escape="\\"),
+                # operador de similitud de pg_trgm (tolera erratas)
+                Food.name.op("%")(term),
+            )
+        )
+        .order_by(_prefix_rank(term), func.similarity(Food.name, term).desc(), Food.name)
+        .limit(limit)
+        .all()
+    )
+
+
+def _search_fts(db: Session, visible, term: str, limit: int) -> list:
+    return (
+        db.query(Food)
+        .join(foods_fts, foods_fts.c.rowid == Food.id)
+        .filter(foods_fts.c.foods_fts.op("MATCH")(_fts_query(term)))
+        .filter(visible)
+        .order_by(foods_fts.c.rank, Food.name)
+        .limit(limit)
+        .all()
+    )
+
+
+def _search_like(db: Session, visible, term: str, limit: int) -> list:
+    pattern = _escape_like(term)
+    return (
+        db.query(Food)
+        .filter(visible)
+        .filter(Food.name.ilike(f"%{pattern}%", escape="\\"))
+        .order_by(_prefix_rank(term), Food.name)
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,138 @@
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Select, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.food import Food
+from app.models.meal import Meal
+from app.services import daily_totals
+from app.services.nutrition import (
+    MACROS, macro_expr, meal_food_name, meal_macro, snapshot, with_food,
+)
+
+EXPORT_FIELDS = ["id", "date", "food_id", "food_name", "quantity", *MACROS]
+# Campos de MealOut, en el orden de meal_rows()
+MEAL_FIELDS = ["id", "user_id", "date", "food_id", "food_name", "quantity", *MACROS]
+
+
+def bulk_create_meals(db: Session, user_id: int, items: list) -> list:
+    """
+    Registra varias comidas de golpe:
+    - una consulta IN para validar todos los food_id (propios o globales)
+    - un único INSERT ... RETURNING para todas las filas válidas
+    - un delta de daily_totals por día, no por comida
+
+    No hace commit. Devuelve un resultado por elemento, en el mismo orden.
+    """
+    food_ids = {item.food_id for item in items}
+    foods = {
+        food.id: food
+        for food in db.query(Food.id, Food.name, *[getattr(Food, m) for m in MACROS])
+        .filter(Food.id.in_(food_ids))
+        .filter(or_(Food.user_id == user_id, Food.user_id.is_(None)))
+    }
+
+    results = [None] * len(items)
+    rows, positions = [], []
+    for index, item in enumerate(items):
+        if item.food_id not in foods:
+            results[index] = {
+                "index": index,
+                "status": "error",
+                "detail": "Alimento no encontrado",
+            }
+            continue
+        rows.append({
+            "user_id": user_id,
+            "food_id": item.food_id,
+            "quantity": item.quantity,
+            "date": item.date or date.today(),
+            **snapshot(foods[item.food_id], item.quantity),
+        })
+        positions.append(index)
+
+    if not rows:
+        return results
+
+    ids = db.execute(
+        insert(Meal).returning(Meal.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+
+    per_day = defaultdict(lambda: dict.fromkeys(MACROS, 0.0))
+    per_day_count = defaultdict(int)
+
+    for meal_id, row, index in zip(ids, rows, positions):
+        for m in MACROS:
+            per_day[row["date"]][m] += row[m]
+        per_day_count[row["date"]] += 1
+
+        results[index] = {
+            "index": index,
+            "status": "created",
+            "meal": {"id": meal_id, **row},
+        }
+
+    for day, delta in per_day.items():
+        daily_totals.apply_delta(db, user_id, day, delta, per_day_count[day])
+
+    return results
+
+
+def meal_rows(user_id: int) -> Select:
+    """
+    Comidas del usuario como filas con los macros y el nombre del alimento
+    ya calculados en el SELECT, sin cargar objetos Meal ni Food.
+    Con MEAL_SNAPSHOTS se leen de meals, sin JOIN.
+    """
+    stmt = select(
+        Meal.id,
+        Meal.user_id,
+        Meal.date,
+        Meal.food_id,
+        meal_food_name().label("food_name"),
+        Meal.quantity,
+        *[meal_macro(m).label(m) for m in MACROS],
+    )
+    return with_food(stmt).where(Meal.user_id == user_id)
+
+
+def backfill_snapshots(db: Session, batch_size: int = 10000) -> int:
+    """
+    Rellena las columnas de copia de las comidas que no las tienen (p.ej.
+    insertadas con SQL) por tramos de id, un UPDATE ... FROM por tramo.
+    No hace commit. Devuelve las filas actualizadas.
+    """
+    last_id = db.scalar(select(func.max(Meal.id))) or 0
+    total = 0
+    for start in range(0, last_id, batch_size):
+        result = db.execute(
+            update(Meal)
+            .where(
+                Food.id == Meal.food_id,
+                Meal.id > start,
+                Meal.id <= start + batch_size,
+                Meal.calories.is_(None),
+            )
+            .values(food_name=Food.name, **{m: macro_expr(m) for m in MACROS})
+        )
+        total += result.rowcount
+    return total
+
+
+def export_query(
+    user_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Select:
+    """
+    Historial de comidas del usuario ordenado por fecha (ver meal_rows).
+    Lo recorre export.stream_rows con un cursor del servidor.
+    """
+    stmt = meal_rows(user_id).order_by(Meal.date, Meal.id)
+    if date_from is not None:
+        stmt = stmt.where(Meal.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Meal.date <= date_to)
+    return stmt
@@ -0,0 +1,44 @@
+from app.config import settings
+from app.models.food import Food
+from app.models.meal import Meal
+
+# Los valores nutricionales de Food son por cada 100g
+MACROS = ("calories", "protein", "carbs", "fat")
+
+
+def macro_expr(name: str):
+    """
+    Expresión SQL con el aporte de un macro para la cantidad de la comida:
+    food.<macro> * meal.quantity / 100
+    """
+    return getattr(Food, name) * Meal.quantity / 100
+
+
+def meal_macro(name: str):
+    """
+    Aporte de un macro en una comida al leerla: con MEAL_SNAPSHOTS la
+    columna guardada en meals al registrarla; si no, macro_expr (hace
+    falta el JOIN con foods, ver with_food).
+    """
+    if settings.meal_snapshots:
+        return getattr(Meal, name)
+    return macro_expr(name)
+
+
+def meal_food_name():
+    return Meal.food_name if settings.meal_snapshots else Food.name
+
+
+def with_food(stmt):
+    """Añade el JOIN con foods a una consulta sobre meals si hace falta."""
+    if settings.meal_snapshots:
+        return stmt
+    return stmt.join(Food, Food.id == Meal.food_id)
+
+
+def snapshot(food, quantity: float) -> dict:
+    """Columnas de copia de una comida (ver Meal.food_name y siguientes)."""
+    return {
+        "food_name": food.name,
+        **{m: getattr(food, m) * quantity / 100 for m in MACROS},
+    }
@@ -0,0 +1,154 @@
+"""
+Borrado por tramos de una cuenta o de un alimento con comidas. Cada
+llamada a un *_step borra como mucho `batch_size` filas con
+DELETE ... WHERE id IN (SELECT id ... LIMIT n) y no hace commit: el
+trabajo (app/services/tasks.py) confirma cada tramo por separado, así
+que no hay una transacción larga con medio historial bloqueado. Se
+borra siempre "lo que quede", de modo que repetir o retomar un borrado
+a medias es seguro.
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.daily_total import DailyTotal
+from app.models.food import Food, RecipeIngredient
+from app.models.goal import Goal
+from app.models.meal import Meal
+from app.models.user import AccountDeletion, User
+from app.services import daily_totals
+
+
+def _count(db: Session, user_id: int, **progress):
+    db.execute(
+        update(AccountDeletion)
+        .where(AccountDeletion.user_id == user_id)
+        .values(**{name: getattr(AccountDeletion, name) + n for name, n in progress.items()})
+    )
+
+
+def hand_over_foods(db: Session, user_id: int, food_ids: list) -> int:
+    """
+    Antes de borrar alimentos de `user_id`: a cada otro usuario que los
+    tenga en sus comidas o recetas le crea una copia privada con los mismos
+    macros y le apunta ahí esas filas, para que el borrado no choque con
+    las claves ajenas ni cambie su historial. Con datos creados antes de
+    comprobar el dueño del alimento en create_meal puede pasar. Devuelve
+    las copias creadas.
+    """
+    used_by = (
+        select(Meal.user_id, Meal.food_id)
+        .where(Meal.food_id.in_(food_ids), Meal.user_id != user_id)
+        .union(
+            select(Food.user_id, RecipeIngredient.food_id)
+            .join(Food, Food.id == RecipeIngredient.recipe_id)
+            .where(RecipeIngredient.food_id.in_(food_ids), Food.user_id != user_id)
+        )
+    )
+    copies = 0
+    for owner, food_id in db.execute(used_by).all():
+        food = db.get(Food, food_id)
+        name = food.name
+        if db.scalar(select(Food.id).where(Food.user_id == owner, Food.name == name)):
+            name = f"{food.name} ({food.id})"
+        copy_id = db.scalar(
+            insert(Food)
+            .values(user_id=owner, name=name, **daily_totals.macros_of(food))
+            .returning(Food.id)
+        )
+        db.execute(
+            update(Meal)
+            .where(Meal.user_id == owner, Meal.food_id == food_id)
+            .values(food_id=copy_id)
+        )
+        db.execute(
+            update(RecipeIngredient)
+            .where(
+                RecipeIngredient.food_id == food_id,
+                RecipeIngredient.recipe_id.in_(select(Food.id).where(Food.user_id == owner)),
+            )
+            .values(food_id=copy_id)
+        )
+        copies += 1
+    return copies
+
+
+def purge_account_step(db: Session, user_id: int, batch_size: int) -> bool:
+    """
+    Borra el siguiente tramo de datos de una cuenta dada de baja, por este
+    orden: comidas, totales diarios, objetivos, alimentos y por último el
+    usuario. Devuelve False cuando ya no queda nada.
+    """
+    meals = select(Meal.id).where(Meal.user_id == user_id).limit(batch_size)
+    deleted = db.execute(delete(Meal).where(Meal.id.in_(meals))).rowcount
+    if deleted:
+        _count(db, user_id, meals_deleted=deleted)
+        return True
+
+    days = select(DailyTotal.date).where(DailyTotal.user_id == user_id).limit(batch_size)
+    if db.execute(
+        delete(DailyTotal).where(DailyTotal.user_id == user_id, DailyTotal.date.in_(days))
+    ).rowcount:
+        return True
+
+    db.execute(delete(Goal).where(Goal.user_id == user_id))
+
+    # Sus comidas ya están borradas; si otros usuarios registraron alguno
+    # de sus alimentos se quedan con una copia. Los ingredientes de sus
+    # recetas se borran con el tramo de alimentos
+    food_ids = db.scalars(
+        select(Food.id).where(Food.user_id == user_id).limit(batch_size)
+    ).all()
+    if food_ids:
+        hand_over_foods(db, user_id, food_ids)
+        db.execute(
+            delete(RecipeIngredient).where(or_(
+                RecipeIngredient.recipe_id.in_(food_ids),
+                RecipeIngredient.food_id.in_(food_ids),
+            ))
+        )
+        db.execute(delete(Food).where(Food.id.in_(food_ids)))
+        _count(db, user_id, foods_deleted=len(food_ids))
+        return True
+
+    db.execute(delete(User).where(User.id == user_id))
+    db.execute(
+        update(AccountDeletion)
+        .where(AccountDeletion.user_id == user_id, AccountDeletion.finished_at.is_(None))
+        .values(finished_at=datetime.utcnow())
+    )
+    return False
+
+
+def purge_food_step(db: Session, user_id: int, food_id: int, batch_size: int) -> int:
+    """
+    Borra el siguiente tramo de comidas de un alimento propio del usuario
+    y regenera los totales de esos días; sin comidas, borra el alimento.
+    Devuelve las comidas borradas (0 cuando ha terminado).
+
+    Solo para alimentos de `user_id` y sus comidas: los del catálogo
+    global no se borran si alguien los ha registrado (ver
+    app/routes/catalog.py), para no tocar el historial de otros. Si aun
+    así hay comidas ajenas (ver hand_over_foods), se quedan con una copia.
+    """
+    own = select(Food.id).where(Food.id == food_id, Food.user_id == user_id)
+    if db.scalar(own) is None:
+        return 0
+
+    meals = (
+        select(Meal.id)
+        .where(Meal.user_id == user_id, Meal.food_id == food_id)
+        .limit(batch_size)
+    )
+    days = db.execute(
+        delete(Meal).where(Meal.id.in_(meals)).returning(Meal.user_id, Meal.date)
+    ).all()
+    if days:
+        daily_totals.refresh_days(db, list(set(map(tuple, days))))
+        return len(days)
+
+    hand_over_foods(db, user_id, [food_id])
+    db.execute(delete(RecipeIngredient).where(RecipeIngredient.recipe_id.in_(own)))
+    db.execute(delete(Food).where(Food.id == food_id, Food.user_id == user_id))
+    return 0
@@ -0,0 +1,69 @@
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.food import Food, RecipeIngredient
+from app.services import daily_totals
+from app.services.nutrition import MACROS
+
+
+def macros_per_100g(ingredients: list) -> dict:
+    """
+    Macros por 100 g de una receta a partir de [(alimento, gramos), ...]:
+    lo que aporta cada ingrediente dividido entre el peso total.
+    """
+    total = sum(grams for _, grams in ingredients)
+    return {
+        m: sum(getattr(food, m) * grams for food, grams in ingredients) / total
+        for m in MACROS
+    }
+
+
+def set_ingredients(db: Session, recipe_id: int, ingredients: dict):
+    """Sustituye los ingredientes de una receta ({food_id: gramos})."""
+    db.execute(delete(RecipeIngredient).where(RecipeIngredient.recipe_id == recipe_id))
+    db.execute(
+        insert(RecipeIngredient),
+        [
+            {"recipe_id": recipe_id, "food_id": food_id, "grams": grams}
+            for food_id, grams in ingredients.items()
+        ],
+    )
+
+
+def recompute_recipes_using(db: Session, food_ids: list) -> list:
+    """
+    Recalcula los macros guardados de las recetas que llevan alguno de
+    los alimentos (tras editarlos) en una sola consulta agregada. Devuelve
+    los ids de todas esas recetas, hayan cambiado o no: sus días hay que
+    regenerarlos igual (daily_totals.refresh_food_days).
+    """
+    # Los macros nuevos de los alimentos pueden estar aún solo en la sesión
+    db.flush()
+
+    recipe_ids = select(RecipeIngredient.recipe_id).where(RecipeIngredient.food_id.in_(food_ids))
+    total = func.sum(RecipeIngredient.grams)
+    new_rows = db.execute(
+        select(
+            RecipeIngredient.recipe_id,
+            *[(func.sum(getattr(Food, m) * RecipeIngredient.grams) / total).label(m) for m in MACROS],
+        )
+        .join(Food, Food.id == RecipeIngredient.food_id)
+        .where(RecipeIngredient.recipe_id.in_(recipe_ids))
+        .group_by(RecipeIngredient.recipe_id)
+    ).all()
+    if not new_rows:
+        return []
+
+    old = {
+        row.id: daily_totals.macros_of(row)
+        for row in db.execute(
+            select(Food.id, *[getattr(Food, m) for m in MACROS])
+            .where(Food.id.in_([row.recipe_id for row in new_rows]))
+        )
+    }
+
+    for row in new_rows:
+        new = daily_totals.macros_of(row)
+        if new != old[row.recipe_id]:
+            db.execute(update(Food).where(Food.id == row.recipe_id).values(**new))
+    return [row.recipe_id for row in new_rows]
@@ -0,0 +1,144 @@
+from datetime import date
+from enum import Enum
+
+from sqlalchemy import Date, func
+from sqlalchemy.orm import Session
+
+from app.models.daily_total import DailyTotal
+from app.models.meal import Meal
+from app.services.nutrition import MACROS, meal_food_name, meal_macro, with_food
+
+
+def get_daily_summary(db: Session, user_id: int, day: date) -> dict:
+    """
+    Calcula el resumen diario de un usuario en UNA sola consulta.
+
+    Cada fila es una comida del día y lleva además los totales del día
+    calculados con SUM(...) OVER (), así que no se cargan objetos ORM
+    ni se suma nada en Python. Con MEAL_SNAPSHOTS solo lee meals.
+    """
+    totals = [func.sum(meal_macro(m)).over().label(f"total_{m}") for m in MACROS]
+
+    query = db.query(
+        meal_food_name().label("food"),
+        Meal.quantity,
+        meal_macro("calories").label("calories"),
+        *totals,
+    )
+    rows = (
+        with_food(query)
+        .filter(Meal.user_id == user_id)
+        .filter(Meal.date == day)
+        .order_by(Meal.id)
+        .all()
+    )
+
+    summary = {f"total_{m}": 0 for m in MACROS}
+    if rows:
+        first = rows[0]
+        summary = {
+            f"total_{m}": round(getattr(first, f"total_{m}"), 2) for m in MACROS
+        }
+
+    summary["meals"] = [
+        {
+            "food": row.food,
+            "quantity": row.quantity,
+            "calories": round(row.calories, 2),
+        }
+        for row in rows
+    ]
+    return summary
+
+
+def goal_status(totals: dict, goal) -> dict:
+    """
+    Compara los totales con el objetivo del usuario.
+    Proteína es un mínimo; calorías, carbohidratos y grasa son máximos.
+    """
+    return {
+        "calories": "✅" if totals["total_calories"] <= goal.calories else "❌",
+        "protein": "✅" if totals["total_protein"] >= goal.protein else "❌",
+        "carbs": "✅" if totals["total_carbs"] <= goal.carbs else "❌",
+        "fat": "✅" if totals["total_fat"] <= goal.fat else "❌",
+    }
+
+
+class Granularity(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+def _bucket_expr(db: Session, granularity: Granularity, column):
+    """
+    Inicio del periodo al que pertenece cada fecha.
+    En PostgreSQL es date_trunc; en SQLite (tests) se emula con date().
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(granularity.value, column).cast(Date)
+
+    if granularity == Granularity.week:
+        # Lunes de la semana, igual que date_trunc('week', ...)
+        return func.date(column, "weekday 0", "-6 days")
+    if granularity == Granularity.month:
+        return func.date(column, "start of month")
+    return func.date(column)
+
+
+def _as_date(value) -> date:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def get_range_summary(
+    db: Session,
+    user_id: int,
+    date_from: date,
+    date_to: date,
+    granularity: Granularity,
+    goal=None,
+) -> list:
+    """
+    Totales de macros agrupados por día, semana o mes en UNA consulta
+    (GROUP BY date_trunc sobre daily_totals, una fila por día registrado).
+
+    Si se pasa el objetivo del usuario, cada periodo incluye la media por
+    día registrado y si se cumple el objetivo diario.
+    """
+    bucket = _bucket_expr(db, granularity, DailyTotal.date).label("bucket")
+
+    rows = (
+        db.query(
+            bucket,
+            func.count().label("days_logged"),
+            func.sum(DailyTotal.meal_count).label("meal_count"),
+            *[func.sum(getattr(DailyTotal, m)).label(f"total_{m}") for m in MACROS],
+        )
+        .filter(DailyTotal.user_id == user_id)
+        .filter(DailyTotal.date >= date_from, DailyTotal.date <= date_to)
+        .group_by(bucket)
+        .order_by(bucket)
+        .all()
+    )
+
+    buckets = []
+    for row in rows:
+        totals = {f"total_{m}": round(getattr(row, f"total_{m}"), 2) for m in MACROS}
+        item = {
+            "start": _as_date(row.bucket),
+            "days_logged": row.days_logged,
+            "meal_count": row.meal_count,
+            **totals,
+        }
+
+        if goal:
+            average = {
+                f"total_{m}": getattr(row, f"total_{m}") / row.days_logged
+                for m in MACROS
+            }
+            item["average"] = {m: round(average[f"total_{m}"], 2) for m in MACROS}
+            item["status"] = goal_status(average, goal)
+
+        buckets.append(item)
+
+    return buckets
@@ -0,0 +1,85 @@
+"""
+Trabajos en segundo plano de la API (ver app/utils/jobs.py). Las rutas
+los encolan en su transacción y responden sin esperar:
+
+    tasks.refresh_foods.enqueue(db, food_ids=[food.id])
+"""
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.food import Food
+from app.services import catalog, daily_totals, purge, recipes
+from app.utils.etag import bump_version
+from app.utils.jobs import task
+
+# Un trabajo de borrado no dura más que esto: lo que quede se encola de
+# nuevo, así no pasa del lease y deja sitio a los demás trabajos
+PURGE_SLICE_SECONDS = 30
+
+
+@task("refresh_foods")
+async def refresh_foods(db: AsyncSession, food_ids: list):
+    """
+    Tras cambiar los macros de unos alimentos: recalcula las recetas que
+    los llevan y regenera daily_totals de los días en que se comieron
+    (ellos o esas recetas). Al acabar cambia el ETag de los dueños, o la
+    versión del catálogo si alguno es global (afecta a todos).
+    """
+    recipe_ids = await db.run_sync(recipes.recompute_recipes_using, food_ids)
+    await db.run_sync(daily_totals.refresh_food_days, [*food_ids, *recipe_ids])
+
+    owners = set(
+        (await db.execute(
+            select(Food.user_id).where(Food.id.in_([*food_ids, *recipe_ids])).distinct()
+        )).scalars()
+    )
+    if None in owners:
+        await catalog.bump_version(db)
+    await db.commit()
+
+    if None in owners:
+        catalog.catalog_cache.invalidate()
+    for user_id in owners - {None}:
+        await bump_version(user_id)
+
+
+@task("delete_user", max_attempts=10)
+async def delete_user(db: AsyncSession, user_id: int):
+    """
+    Borra por tramos los datos de un usuario dado de baja (DELETE
+    /users/{id}); el progreso queda en account_deletions.
+    """
+    deadline = time.monotonic() + PURGE_SLICE_SECONDS
+    while await db.run_sync(purge.purge_account_step, user_id, settings.purge_batch_size):
+        if time.monotonic() > deadline:
+            delete_user.enqueue(db, user_id=user_id)
+            await db.commit()
+            return
+        await db.commit()
+    await db.commit()
+    await bump_version(user_id)
+
+
+@task("delete_food", max_attempts=10)
+async def delete_food(db: AsyncSession, user_id: int, food_id: int):
+    """
+    Borra por tramos las comidas de un alimento propio, regenerando los
+    totales de esos días, y al final el alimento (DELETE /foods/{id}).
+    """
+    deadline = time.monotonic() + PURGE_SLICE_SECONDS
+    while await db.run_sync(
+        purge.purge_food_step, user_id, food_id, settings.purge_batch_size
+    ):
+        expired = time.monotonic() > deadline
+        if expired:
+            delete_food.enqueue(db, user_id=user_id, food_id=food_id)
+        await db.commit()
+        # Cada tramo cambia sus totales diarios
+        await bump_version(user_id)
+        if expired:
+            return
+    await db.commit()
+    await bump_version(user_id)
@@ -0,0 +1,165 @@
+import hashlib
+import secrets
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_async_db
+from app.schemas.user import CurrentUser
+from app.services.catalog import catalog_cache
+from app.utils.redis_client import get_redis
+from app.utils.security import get_current_user
+
+ETAG_HEADER = "ETag"
+
+
+class VersionStore(ABC):
+    """
+    Versión de los datos de cada usuario. Los handlers que escriben
+    comidas, alimentos u objetivos llaman a bump() después del commit y
+    las lecturas la usan para calcular el ETag.
+
+    get() devuelve un texto opaco: solo importa que cambie en cada bump()
+    y que no se repita un valor antiguo (p.ej. tras reiniciar).
+    """
+
+    @abstractmethod
+    async def get(self, user_id: int) -> str:
+        ...
+
+    @abstractmethod
+    async def bump(self, user_id: int) -> None:
+        ...
+
+
+class MemoryVersionStore(VersionStore):
+    """
+    Contadores en memoria. El nonce cambia en cada arranque para que un
+    contador que vuelve a 0 no coincida con un ETag de antes.
+    Solo es correcto con un único proceso (desarrollo y tests).
+    """
+
+    def __init__(self):
+        self.nonce = secrets.token_hex(8)
+        self._versions: Dict[int, int] = {}
+
+    async def get(self, user_id: int) -> str:
+        return f"{self.nonce}:{self._versions.get(user_id, 0)}"
+
+    async def bump(self, user_id: int) -> None:
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def clear(self):
+        self._versions.clear()
+
+
+class RedisVersionStore(VersionStore):
+    """
+    Contadores compartidos por todos los workers en Redis. Una clave que
+    no existe (usuario nuevo o Redis vaciado) empieza en la hora actual
+    en ns, así nunca vuelve a un valor ya usado.
+    """
+
+    prefix = "nutri:version:"
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+
+    async def get(self, user_id: int) -> str:
+        key = f"{self.prefix}{user_id}"
+        version = await self.client.get(key)
+        if version is None:
+            await self.client.set(key, time.time_ns(), nx=True)
+            version = await self.client.get(key)
+        return version
+
+    async def bump(self, user_id: int) -> None:
+        key = f"{self.prefix}{user_id}"
+        # INCR de una clave que no existía devuelve 1: se borra para que
+        # get() la cree con un valor nuevo en vez de empezar desde 1
+        if await self.client.incr(key) == 1:
+            await self.client.delete(key)
+
+
+def make_store() -> VersionStore:
+    if settings.cache_backend == "redis":
+        return RedisVersionStore()
+    return MemoryVersionStore()
+
+
+_store: Optional[VersionStore] = None
+
+
+def version_store() -> VersionStore:
+    global _store
+    if _store is None:
+        _store = make_store()
+    return _store
+
+
+async def bump_version(user_id: int):
+    await version_store().bump(user_id)
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # En If-None-Match se compara sin tener en cuenta W/
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags
+
+
+async def check_etag(
+    request: Request,
+    response: Response,
+    user_id: int,
+    extra: str = "",
+):
+    """
+    Calcula el ETag de la petición (versión del usuario + ruta + query +
+    `extra`) y, si el cliente ya lo tiene, corta con 304 sin ejecutar la
+    consulta. Si no, lo deja en la respuesta.
+    """
+    version = await version_store().get(user_id)
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    key = f"{version}|{request.url.path}?{query}|{extra}"
+    etag = '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={ETAG_HEADER: etag},
+        )
+    response.headers[ETAG_HEADER] = etag
+
+
+async def _catalog_version(db: AsyncSession) -> str:
+    # Los macros de los alimentos globales afectan a comidas y resúmenes
+    catalog = await catalog_cache.get(db)
+    return f"catalog:{catalog.version}"
+
+
+async def etag_for_current_user(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Dependencia para los GET con datos del usuario autenticado."""
+    await check_etag(request, response, current_user.id, await _catalog_version(db))
+
+
+async def etag_for_path_user(
+    request: Request,
+    response: Response,
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Dependencia para los GET /users/{user_id}/... (resúmenes)."""
+    await check_etag(request, response, user_id, await _catalog_version(db))
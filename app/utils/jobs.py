@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import traceback
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import and_, delete, event, or_, select, update
+
+from app.config import settings
+from app.database import engines
+from app.models.job import Job
+
+logger = logging.getLogger("app.jobs")
+
+# Espera entre reintentos: 5 s, 10 s, 20 s... hasta 10 minutos
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 600
+
+
+class Task:
+    """Función registrada con @task; se encola con task.enqueue(db, **payload)."""
+
+    def __init__(self, name: str, fn: Callable[..., Awaitable], max_attempts: int):
+        self.name = name
+        self.fn = fn
+        self.max_attempts = max_attempts
+
+    def enqueue(self, db, delay: float = 0, **payload):
+        """
+        Encola el trabajo en la transacción de `db` (Session o AsyncSession):
+        solo se ejecuta si se hace commit. El payload tiene que ser JSON.
+        """
+        run_at = datetime.utcnow() + timedelta(seconds=delay)
+        job_backend().enqueue(db, self, payload, run_at)
+
+
+TASKS: Dict[str, Task] = {}
+
+
+def task(name: str, max_attempts: int = 5):
+    """
+    Registra una corrutina `fn(db: AsyncSession, **payload)` como trabajo.
+    Cada ejecución tiene su propia sesión y hace sus commits, como una
+    ruta. Un trabajo puede repetirse (reintentos, worker caído tras el
+    commit), así que tiene que poder ejecutarse dos veces sin problema.
+    """
+    def decorator(fn):
+        if name in TASKS:
+            raise ValueError(f"Trabajo ya registrado: {name}")
+        TASKS[name] = Task(name, fn, max_attempts)
+        return TASKS[name]
+
+    return decorator
+
+
+class ClaimedJob(NamedTuple):
+    id: int
+    name: str
+    payload: dict
+    attempts: int  # contando esta
+    max_attempts: int
+
+
+def retry_delay(attempts: int) -> float:
+    return min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+
+
+class JobBackend(ABC):
+    @abstractmethod
+    def enqueue(self, db, task: Task, payload: dict, run_at: datetime) -> None:
+        ...
+
+    @abstractmethod
+    async def claim(self, limit: int) -> List[ClaimedJob]:
+        """Marca como en curso hasta `limit` trabajos listos y los devuelve."""
+
+    @abstractmethod
+    async def complete(self, job: ClaimedJob) -> None:
+        ...
+
+    @abstractmethod
+    async def fail(self, job: ClaimedJob, error: str, retry_at: Optional[datetime]) -> None:
+        """Vuelve a la cola para `retry_at` o, si es None, queda como fallido."""
+
+
+class DatabaseJobBackend(JobBackend):
+    """
+    Cola en la tabla jobs. Varios workers (procesos o máquinas) cogen
+    trabajos a la vez con SELECT ... FOR UPDATE SKIP LOCKED sin pisarse.
+    Un trabajo en curso más de JOB_LEASE_SECONDS se da por perdido (el
+    worker murió) y vuelve a cogerse.
+    """
+
+    def enqueue(self, db, task: Task, payload: dict, run_at: datetime) -> None:
+        db.add(Job(name=task.name, payload=payload, max_attempts=task.max_attempts, run_at=run_at))
+
+    async def claim(self, limit: int) -> List[ClaimedJob]:
+        now = datetime.utcnow()
+        lost = now - timedelta(seconds=settings.job_lease_seconds)
+        async with engines().AsyncSessionLocal() as db:
+            jobs = (
+                await db.execute(
+                    select(Job)
+                    .where(or_(
+                        and_(Job.status == "queued", Job.run_at <= now),
+                        and_(Job.status == "running", Job.locked_at < lost),
+                    ))
+                    .order_by(Job.run_at, Job.id)
+                    .limit(limit)
+                    .with_for_update(skip_locked=True)
+                )
+            ).scalars().all()
+            for job in jobs:
+                job.status = "running"
+                job.locked_at = now
+                job.attempts += 1
+            await db.commit()
+            return [
+                ClaimedJob(job.id, job.name, job.payload, job.attempts, job.max_attempts)
+                for job in jobs
+            ]
+
+    async def complete(self, job: ClaimedJob) -> None:
+        async with engines().AsyncSessionLocal() as db:
+            await db.execute(delete(Job).where(Job.id == job.id))
+            await db.commit()
+
+    async def fail(self, job: ClaimedJob, error: str, retry_at: Optional[datetime]) -> None:
+        values = {"last_error": error, "locked_at": None}
+        if retry_at is None:
+            values["status"] = "failed"
+        else:
+            values.update(status="queued", run_at=retry_at)
+        async with engines().AsyncSessionLocal() as db:
+            await db.execute(update(Job).where(Job.id == job.id).values(**values))
+            await db.commit()
+
+
+PENDING_KEY = "pending_jobs"
+
+
+class MemoryJobBackend(JobBackend):
+    """
+    Cola en memoria del proceso, para tests y desarrollo: los trabajos se
+    pierden al reiniciar y solo los ve el propio proceso (JOBS_IN_PROCESS).
+    """
+
+    def __init__(self):
+        self._next_id = 0
+        self._queue = deque()  # (run_at, ClaimedJob) en cola
+        self.failed: List[tuple] = []  # (ClaimedJob, error)
+
+    def enqueue(self, db, task: Task, payload: dict, run_at: datetime) -> None:
+        self._next_id += 1
+        job = ClaimedJob(self._next_id, task.name, payload, 0, task.max_attempts)
+        # Como con la tabla jobs: solo si se confirma la transacción
+        session = getattr(db, "sync_session", db)
+        if not session.in_transaction():
+            # Sin transacción abierta un rollback() no lanza eventos
+            session.begin()
+        session.info.setdefault(PENDING_KEY, []).append((run_at, job))
+        if not event.contains(session, "after_commit", self._on_commit):
+            event.listen(session, "after_commit", self._on_commit)
+            # "soft": también salta si la transacción no llegó a la BD
+            event.listen(session, "after_soft_rollback", self._on_rollback)
+
+    def _on_commit(self, session):
+        self._queue.extend(session.info.pop(PENDING_KEY, []))
+
+    def _on_rollback(self, session, previous_transaction):
+        # El rollback de un SAVEPOINT no deshace la transacción externa
+        if previous_transaction.parent is None:
+            session.info.pop(PENDING_KEY, None)
+
+    async def claim(self, limit: int) -> List[ClaimedJob]:
+        now = datetime.utcnow()
+        ready, waiting = [], deque()
+        while self._queue:
+            run_at, job = self._queue.popleft()
+            if run_at <= now and len(ready) < limit:
+                ready.append(job._replace(attempts=job.attempts + 1))
+            else:
+                waiting.append((run_at, job))
+        self._queue = waiting
+        return ready
+
+    async def complete(self, job: ClaimedJob) -> None:
+        pass
+
+    async def fail(self, job: ClaimedJob, error: str, retry_at: Optional[datetime]) -> None:
+        if retry_at is None:
+            self.failed.append((job, error))
+        else:
+            self._queue.append((retry_at, job))
+
+    def clear(self):
+        self._queue.clear()
+        self.failed.clear()
+
+
+_backend: Optional[JobBackend] = None
+
+
+def job_backend() -> JobBackend:
+    global _backend
+    if _backend is None:
+        if settings.job_backend == "memory":
+            _backend = MemoryJobBackend()
+        else:
+            _backend = DatabaseJobBackend()
+    return _backend
+
+
+class JobWorker:
+    """
+    Ejecuta los trabajos de la cola con como mucho `concurrency` a la vez
+    en el event loop. Lo arranca scripts/worker.py o, con JOBS_IN_PROCESS,
+    cada proceso de la API al arrancar.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[JobBackend] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.backend = backend or job_backend()
+        self.concurrency = concurrency or settings.job_concurrency
+        self.poll_interval = settings.job_poll_interval if poll_interval is None else poll_interval
+        self._running: set = set()
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        """Hasta stop(): coge trabajos cuando hay hueco y si no hay, espera."""
+        while not self._stopping.is_set():
+            if len(self._running) >= self.concurrency:
+                await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+            elif not await self._claim():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        if self._running:
+            await asyncio.wait(self._running)
+
+    async def run_until_idle(self):
+        """Ejecuta lo que haya listo en la cola y vuelve (scripts, tests)."""
+        while True:
+            if len(self._running) < self.concurrency and await self._claim():
+                continue
+            if not self._running:
+                return
+            await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+
+    def stop(self):
+        self._stopping.set()
+
+    async def _claim(self) -> int:
+        try:
+            jobs = await self.backend.claim(self.concurrency - len(self._running))
+        except Exception:
+            logger.exception("No se han podido leer trabajos de la cola")
+            return 0
+        for job in jobs:
+            running = asyncio.create_task(self._execute(job))
+            self._running.add(running)
+            running.add_done_callback(self._running.discard)
+        return len(jobs)
+
+    async def _execute(self, job: ClaimedJob):
+        task = TASKS.get(job.name)
+        try:
+            if task is None:
+                raise LookupError(f"Trabajo no registrado: {job.name}")
+            async with engines().AsyncSessionLocal() as db:
+                await task.fn(db, **job.payload)
+        except Exception:
+            error = traceback.format_exc(limit=5)
+            retry_at = None
+            if task is not None and job.attempts < job.max_attempts:
+                retry_at = datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts))
+            logger.warning(
+                "Trabajo %s (%s) falló en el intento %d/%d%s",
+                job.id, job.name, job.attempts, job.max_attempts,
+                "" if retry_at else "; no se reintenta", exc_info=True,
+            )
+            try:
+                await self.backend.fail(job, error, retry_at)
+            except Exception:
+                # Con la tabla jobs se volverá a coger al caducar el lease
+                logger.exception("No se ha podido marcar el trabajo %s", job.id)
+            return
+
+        try:
+            await self.backend.complete(job)
+        except Exception:
+            logger.exception("No se ha podido marcar el trabajo %s como hecho", job.id)
@@ -0,0 +1,68 @@
+import base64
+import json
+from datetime import date
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Cabecera con el cursor de la siguiente página (vacía en la última)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    """Cursor opaco con los valores de ordenación de la última fila."""
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [
+            date.fromisoformat(v) if column.type.python_type is date else v
+            for v, column in zip(values, columns)
+        ]
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor no válido",
+        )
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt,
+    columns: list,
+    cursor: Optional[str],
+    limit: int,
+    response: Response,
+    as_rows: bool = False,
+) -> list:
+    """
+    Paginación por clave (keyset): WHERE (col1, col2) > (cursor) ORDER BY
+    col1, col2 LIMIT n. El coste no depende de la página pedida.
+
+    Devuelve las filas de la página y deja el cursor de la siguiente en
+    la cabecera X-Next-Cursor si quedan más. Con as_rows=True devuelve
+    las filas (Row) de un select de columnas en vez de objetos ORM.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        stmt = stmt.where(tuple_(*columns) > tuple_(*values))
+
+    stmt = stmt.order_by(*columns).limit(limit + 1)
+    result = await db.execute(stmt) if as_rows else await db.scalars(stmt)
+    rows = result.all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column in columns]
+        )
+    return rows
@@ -0,0 +1,113 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from app.config import settings
+
+_pwd_context: Optional[CryptContext] = None
+
+
+def pwd_context() -> CryptContext:
+    """
+    Las rondas se configuran por entorno (PASSWORD_HASH_ROUNDS). Si cambian,
+    los hashes antiguos se rehacen en el siguiente login (verify_and_update).
+    """
+    global _pwd_context
+    if _pwd_context is None:
+        _pwd_context = CryptContext(
+            schemes=["pbkdf2_sha256"],
+            deprecated="auto",
+            pbkdf2_sha256__rounds=settings.password_hash_rounds,
+        )
+    return _pwd_context
+
+
+def _load_context():
+    pwd_context()
+
+
+def hash_password(password: str) -> str:
+    return pwd_context().hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Comprueba la contraseña y, si el hash está desfasado, devuelve uno nuevo."""
+    return pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Ejecuta el hash de contraseñas (PBKDF2, pura CPU) en un pool de procesos
+    para no bloquear el event loop ni competir por el GIL con el resto de
+    peticiones.
+
+    Como mucho admite `workers + queue_size` operaciones a la vez; a partir
+    de ahí responde 503 en lugar de acumular logins esperando.
+    Con workers = 0 usa el threadpool de Starlette (desarrollo y tests).
+    Sin valores propios se usan PASSWORD_HASH_WORKERS y PASSWORD_HASH_QUEUE.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self._workers = workers
+        self._queue_size = queue_size
+        self.in_flight = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def workers(self) -> int:
+        return settings.password_hash_workers if self._workers is None else self._workers
+
+    @property
+    def queue_size(self) -> int:
+        return settings.password_hash_queue if self._queue_size is None else self._queue_size
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def start(self):
+        """Arranca los procesos ya (al arrancar la app) y no en el primer login."""
+        if self.workers > 0:
+            for future in [self.executor.submit(_load_context) for _ in range(self.workers)]:
+                future.result()
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= max(self.workers, 1) + self.queue_size:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, inténtalo de nuevo en unos segundos",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str):
+        return await self._run(verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
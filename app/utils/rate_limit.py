@@ -0,0 +1,197 @@
+import math
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.config import settings
+from app.schemas.user import CurrentUser
+from app.utils.redis_client import get_redis
+from app.utils.security import get_current_user
+
+# Presupuesto por ruta: "peticiones/periodo". Se pueden cambiar con
+# RATE_LIMITS='{"login": "20/minute"}' (se mezcla con estos)
+DEFAULT_RATE_LIMITS = {
+    "login": "10/minute",
+    "register": "5/hour",
+    "search": "10/second",
+    "bulk": "30/minute",
+    "import": "10/hour",
+    "export": "10/hour",
+}
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Budget(NamedTuple):
+    capacity: int  # ráfaga máxima
+    rate: float  # fichas que se recuperan por segundo
+
+    @classmethod
+    def parse(cls, value: str) -> "Budget":
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour|day)\s*", value)
+        if not match:
+            raise ValueError(f"Límite no válido: {value!r} (p.ej. '10/minute')")
+        count, period = int(match.group(1)), match.group(2)
+        return cls(count, count / PERIODS[period])
+
+
+class RateLimitBackend(ABC):
+    """
+    Cubo de fichas por clave. take() gasta una ficha y devuelve 0 si la
+    petición puede seguir, o los segundos que faltan para la siguiente.
+    """
+
+    @abstractmethod
+    async def take(self, key: str, budget: Budget) -> float:
+        ...
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Cubos en memoria del proceso: con varios workers cada uno lleva su
+    cuenta, así que el límite real es N veces el configurado.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, budget: Budget) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(budget.capacity), now]
+                if len(self._buckets) > self.maxsize:
+                    # Olvidar un cubo solo lo rellena: como mucho se deja pasar de más
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            tokens = min(budget.capacity, bucket[0] + (now - bucket[1]) * budget.rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / budget.rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# Mismo algoritmo que MemoryRateLimitBackend, atómico dentro de Redis
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Cubos compartidos por todos los workers (CACHE_BACKEND=redis)."""
+
+    prefix = "nutri:ratelimit:"
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+        self._script = self.client.register_script(TOKEN_BUCKET_LUA)
+
+    async def take(self, key: str, budget: Budget) -> float:
+        wait = await self._script(
+            keys=[self.prefix + key],
+            args=[budget.capacity, budget.rate, time.time()],
+        )
+        return float(wait)
+
+
+_backend: Optional[RateLimitBackend] = None
+
+
+def rate_limit_backend() -> RateLimitBackend:
+    global _backend
+    if _backend is None:
+        if settings.cache_backend == "redis":
+            _backend = RedisRateLimitBackend()
+        else:
+            _backend = MemoryRateLimitBackend()
+    return _backend
+
+
+_budgets: Optional[Dict[str, Budget]] = None
+
+
+def budgets() -> Dict[str, Budget]:
+    """Presupuestos por defecto con los de RATE_LIMITS encima; se leen al primer uso."""
+    global _budgets
+    if _budgets is None:
+        _budgets = {
+            name: Budget.parse(value)
+            for name, value in {**DEFAULT_RATE_LIMITS, **settings.rate_limits}.items()
+        }
+    return _budgets
+
+
+async def check_rate_limit(name: str, key: str):
+    if not settings.rate_limit_enabled:
+        return
+    wait = await rate_limit_backend().take(f"{name}:{key}", budgets()[name])
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiadas peticiones, inténtalo de nuevo más tarde",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    # Detrás de un proxy, uvicorn --proxy-headers pone aquí la IP real
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_user(name: str, when: Optional[Callable[[Request], bool]] = None):
+    """
+    Dependencia que limita la ruta por usuario con el presupuesto `name`.
+    Con `when` solo cuenta las peticiones que lo cumplen (p.ej. las que
+    llevan ?search=).
+    """
+    DEFAULT_RATE_LIMITS[name]  # falla al arrancar si el nombre no existe
+
+    async def dependency(
+        request: Request,
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        if when is None or when(request):
+            await check_rate_limit(name, f"user:{current_user.id}")
+
+    return dependency
+
+
+def limit_by_ip(name: str):
+    """Como limit_by_user, por IP: para las rutas sin usuario (login, registro)."""
+    DEFAULT_RATE_LIMITS[name]
+
+    async def dependency(request: Request):
+        await check_rate_limit(name, f"ip:{client_ip(request)}")
+
+    return dependency
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from app.config import settings
+
+_client = None
+
+
+def get_redis(url: Optional[str] = None):
+    """
+    Cliente asyncio de Redis compartido por el proceso. redis es una
+    dependencia opcional: solo hace falta con CACHE_BACKEND=redis.
+    """
+    global _client
+    if _client is None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis necesita el paquete redis (pip install redis)"
+            ) from e
+
+        url = url or settings.redis_url
+        if not url:
+            raise RuntimeError("CACHE_BACKEND=redis necesita REDIS_URL")
+        _client = redis.from_url(url, decode_responses=True)
+    return _client
+
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,229 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql")
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    """Tiempo en la base de datos y sentencias de UNA petición."""
+
+    __slots__ = ("db_seconds", "statements")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.statements = 0
+
+
+# Lo fija el middleware; lo ven los eventos del motor de la misma petición
+# (también dentro de db.run_sync y del threadpool, que copian el contexto)
+current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """Histograma acumulado al estilo Prometheus, con una serie por etiquetas."""
+
+    def __init__(self, name: str, help: str, buckets: tuple, labels: tuple):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for labels, (counts, count, total) in items:
+            base = _labels(self.labels, labels)
+            cumulative = 0
+            for bucket, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _labels(self.labels + ("le",), labels + (bucket,))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = _labels(self.labels + ("le",), labels + ("+Inf",))
+            lines.append(f"{self.name}_bucket{inf} {count}")
+            lines.append(f"{self.name}_count{base} {count}")
+            lines.append(f"{self.name}_sum{base} {round(total, 6)}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+request_latency = Histogram(
+    "http_request_duration_seconds",
+    "Duración de las peticiones por ruta",
+    LATENCY_BUCKETS,
+    ("method", "route"),
+)
+request_db_time = Histogram(
+    "http_request_db_seconds",
+    "Tiempo en la base de datos por petición",
+    LATENCY_BUCKETS,
+    ("method", "route"),
+)
+request_statements = Histogram(
+    "http_request_db_statements",
+    "Sentencias SQL por petición (muchas = posible N+1)",
+    STATEMENT_BUCKETS,
+    ("method", "route"),
+)
+responses_total = defaultdict(int)  # (method, route, status) -> peticiones
+slow_queries_total = 0
+
+
+def listen_query_events(engine):
+    """
+    Mide cada sentencia: la suma a la petición en curso y la registra en
+    el log si tarda más de SLOW_QUERY_MS.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        global slow_queries_total
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+        stats = current_stats.get()
+        if stats is not None:
+            stats.db_seconds += elapsed
+            stats.statements += 1
+
+        if settings.slow_query_ms and elapsed * 1000 >= settings.slow_query_ms:
+            slow_queries_total += 1
+            logger.warning(
+                "Consulta lenta (%.1f ms): %s | parámetros: %.500r",
+                elapsed * 1000, statement, parameters,
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # La sentencia falló: after_cursor_execute no llega a ejecutarse
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware ASGI: mide cada petición, guarda los histogramas por ruta
+    (la plantilla, p.ej. /foods/{food_id}, no la URL) y añade la cabecera
+    Server-Timing con el tiempo total y el de la base de datos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.server_timing:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    value = (
+                        f"app;dur={elapsed:.1f}, "
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries"'
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (SERVER_TIMING_HEADER.lower().encode(), value.encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_stats.reset(token)
+            route = scope.get("route")
+            # Sin ruta (404) se agrupa todo para no crear una serie por URL
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            request_latency.observe(time.perf_counter() - start, method, path)
+            request_db_time.observe(stats.db_seconds, method, path)
+            request_statements.observe(stats.statements, method, path)
+            responses_total[(method, path, status_code)] += 1
+
+
+def render_prometheus(pools: dict) -> str:
+    """Métricas en formato de texto de Prometheus, con las de los pools."""
+    lines = []
+    for histogram in (request_latency, request_db_time, request_statements):
+        lines += histogram.render()
+
+    lines += [
+        "# HELP http_responses_total Respuestas por ruta y código",
+        "# TYPE http_responses_total counter",
+    ]
+    for labels, count in sorted(responses_total.items()):
+        lines.append(
+            f"http_responses_total{_labels(('method', 'route', 'status'), labels)} {count}"
+        )
+
+    lines += [
+        "# HELP db_slow_queries_total Consultas por encima de SLOW_QUERY_MS",
+        "# TYPE db_slow_queries_total counter",
+        f"db_slow_queries_total {slow_queries_total}",
+    ]
+
+    # pool_stats(): {"sync": {...}, "async": {...}}
+    names = sorted({key for stats in pools.values() for key in stats})
+    for key in names:
+        kind = "counter" if key in POOL_COUNTERS else "gauge"
+        lines += [f"# TYPE db_pool_{key} {kind}"]
+        for engine_name, stats in pools.items():
+            if key in stats:
+                lines.append(f'db_pool_{key}{{engine="{engine_name}"}} {stats[key]}')
+
+    return "\n".join(lines) + "\n"
+
+
+POOL_COUNTERS = {
+    "connects", "checkouts", "checkins", "invalidated", "timeouts",
+    "wait_count", "wait_seconds_total",
+}
@@ -0,0 +1,16 @@
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+
+def rows_response(rows, fields: list, response: Response) -> ORJSONResponse:
+    """
+    Respuesta JSON construida directamente desde filas (Row o NamedTuple)
+    con los `fields` del schema de salida, sin pasar por el response_model.
+
+    Al devolver una Response, FastAPI ya no copia las cabeceras del
+    parámetro `response` (X-Next-Cursor, ETag), así que se copian aquí.
+    """
+    return ORJSONResponse(
+        [{f: getattr(row, f) for f in fields} for row in rows],
+        headers=dict(response.headers),
+    )
@@ -1,52 +1,109 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_async_db
 from app.models.user import User
+from app.schemas.user import CurrentUser
+from app.utils.cache import TTLCache
+from app.utils.token_state import REVOKED, token_state
 
-SECRET_KEY = "secreto-super-seguro"
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# Usuarios autenticados recientes: evita el SELECT de users en cada petición.
+# Se invalida al editar o borrar el usuario (app/routes/users.py). El tamaño
+# y el TTL (USER_CACHE_SIZE, USER_CACHE_TTL) los fija create_app().
+user_cache = TTLCache(maxsize=10000, ttl=60)
 
-
-def get_password_hash(password: str) -> str:
-    return hash_password(password)
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def user_claims(user: User) -> dict:
+    """Claims que llevan los tokens: id, rol y versión del token."""
+    return {"sub": str(user.id), "role": user.role, "ver": user.token_version}
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """
+    Usuario autenticado sin ir a la BD siempre que se pueda:
+    1. caché de usuarios del proceso; con AUTH_TOKEN_CLAIMS, solo si la
+       versión del token coincide con la vigente en token_state()
+    2. claims del token (solo con AUTH_TOKEN_CLAIMS activado), con la
+       misma comprobación
+    3. SELECT de users, que se guarda en la caché
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido o expirado",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
         user_id = int(payload.get("sub"))
-    except (JWTError, ValueError):
+        version = int(payload.get("ver", 0))
+    except (JWTError, TypeError, ValueError):
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    if settings.auth_token_claims:
+        # revoke_tokens() solo vacía la caché del proceso que lo llama: en
+        # los demás una entrada de la caché vale si coincide con token_state()
+        current_user = None
+        current = await token_state().get(user_id)
+        if current is not None:
+            if current != version:
+                user_cache.invalidate(user_id)
+                raise credentials_exception
+            cached = user_cache.get(user_id)
+            if cached is not None and cached.token_version == current:
+                current_user = cached
+            elif "role" in payload:
+                current_user = CurrentUser(id=user_id, role=payload["role"], token_version=version)
+    else:
+        current_user = user_cache.get(user_id)
+
+    if current_user is None:
+        user = await db.get(User, user_id)
+        if not user:
+            raise credentials_exception
+        if settings.auth_token_claims:
+            await token_state().set(
+                user_id, REVOKED if user.deleted_at is not None else user.token_version
+            )
+        if user.deleted_at is not None:
+            raise credentials_exception
+        current_user = CurrentUser.from_orm(user)
+        user_cache.set(user_id, current_user)
+
+    # Token emitido antes de un cambio de contraseña
+    if version != current_user.token_version:
         raise credentials_exception
-    return user
+    return current_user
+
+
+async def revoke_tokens(user_id: int, version: int):
+    """
+    Tras cambiar token_version (contraseña) o dar de baja la cuenta
+    (REVOKED), ya confirmado en la BD: los tokens anteriores dejan de valer.
+    """
+    user_cache.invalidate(user_id)
+    if settings.auth_token_claims:
+        await token_state().set(user_id, version)
+
+
+def ensure_admin(current_user: CurrentUser):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para realizar esta operación",
+        )
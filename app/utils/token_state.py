@@ -0,0 +1,78 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.redis_client import get_redis
+
+# Cuenta dada de baja: ningún token vale
+REVOKED = -1
+
+
+class TokenStateStore(ABC):
+    """
+    Versión de token vigente de cada usuario (o REVOKED), para que con
+    AUTH_TOKEN_CLAIMS un cambio de contraseña o una baja invaliden los
+    tokens sin consultar users en cada petición. Se escribe al cambiar
+    token_version y al leer el usuario de la BD; una clave que falta
+    (caducada, Redis vaciado) obliga a leer la BD, nunca da por bueno el
+    token.
+    """
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    async def set(self, user_id: int, version: int) -> None:
+        ...
+
+
+class MemoryTokenStateStore(TokenStateStore):
+    """En memoria del proceso: solo es correcto con un único proceso."""
+
+    def __init__(self):
+        self._states = TTLCache(maxsize=100000, ttl=settings.access_token_expire_minutes * 60)
+
+    async def get(self, user_id: int) -> Optional[int]:
+        return self._states.get(user_id)
+
+    async def set(self, user_id: int, version: int) -> None:
+        self._states.set(user_id, version)
+
+    def clear(self):
+        self._states.clear()
+
+
+class RedisTokenStateStore(TokenStateStore):
+    """
+    Compartido por todos los workers. Las claves caducan con los tokens:
+    pasado ese tiempo ya no queda ninguno emitido con una versión antigua.
+    """
+
+    prefix = "nutri:token:"
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+
+    async def get(self, user_id: int) -> Optional[int]:
+        version = await self.client.get(f"{self.prefix}{user_id}")
+        return None if version is None else int(version)
+
+    async def set(self, user_id: int, version: int) -> None:
+        await self.client.set(
+            f"{self.prefix}{user_id}", version, ex=settings.access_token_expire_minutes * 60
+        )
+
+
+_store: Optional[TokenStateStore] = None
+
+
+def token_state() -> TokenStateStore:
+    global _store
+    if _store is None:
+        if settings.cache_backend == "redis":
+            _store = RedisTokenStateStore()
+        else:
+            _store = MemoryTokenStateStore()
+    return _store
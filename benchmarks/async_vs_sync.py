@@ -0,0 +1,75 @@
+"""
+Compara el rendimiento de un endpoint síncrono (def + SessionLocal) con el
+mismo endpoint asíncrono (async def + AsyncSession) contra la misma base de
+datos de DATABASE_URL.
+
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 200
+    python -m benchmarks.async_vs_sync --query summary --user 1 --date 2025-01-01
+
+Con --query sleep cada petición hace un SELECT pg_sleep(--delay), que
+simula una consulta lenta sin depender de los datos. Las peticiones se
+lanzan en proceso con httpx.ASGITransport, así que el límite del
+threadpool de Starlette (40 hilos) afecta igual que con uvicorn.
+"""
+import argparse
+import asyncio
+from datetime import date
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import get_async_db, get_db
+from app.models import user, food, goal, meal, daily_total
+from app.services import summary
+from benchmarks.common import run_load
+
+
+def build_apps(args):
+    def run_query(db: Session):
+        if args.query == "sleep":
+            return db.execute(text("SELECT pg_sleep(:delay)"), {"delay": args.delay}).all()
+        return summary.get_daily_summary(db, args.user, args.date)
+
+    sync_app = FastAPI()
+
+    @sync_app.get("/")
+    def sync_endpoint(db: Session = Depends(get_db)):
+        run_query(db)
+        return {"ok": True}
+
+    async_app = FastAPI()
+
+    @async_app.get("/")
+    async def async_endpoint(db: AsyncSession = Depends(get_async_db)):
+        await db.run_sync(run_query)
+        return {"ok": True}
+
+    return {"sync": sync_app, "async": async_app}
+
+
+async def drive(app, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await run_load(lambda: client.get("/"), total, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--query", choices=["sleep", "summary"], default="sleep")
+    parser.add_argument("--delay", type=float, default=0.01, help="Segundos de pg_sleep")
+    parser.add_argument("--user", type=int, default=1)
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today())
+    args = parser.parse_args()
+
+    for name, app in build_apps(args).items():
+        result = asyncio.run(drive(app, args.requests, args.concurrency))
+        print(f"{name:>5}: {result}")
+
+
+if __name__ == "__main__":
+    main()
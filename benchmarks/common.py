@@ -0,0 +1,45 @@
+import asyncio
+import statistics
+import time
+
+
+def latency_stats(latencies: list, elapsed: float) -> dict:
+    """req/s y percentiles de latencia (en ms) de una tanda de peticiones."""
+    latencies = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        index = min(len(latencies) - 1, max(0, round(p * len(latencies)) - 1))
+        return round(latencies[index] * 1000, 2)
+
+    return {
+        "requests": len(latencies),
+        "req_s": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else 0,
+        "p95_ms": percentile(0.95) if latencies else 0,
+        "p99_ms": percentile(0.99) if latencies else 0,
+    }
+
+
+async def run_load(send, total: int, concurrency: int) -> dict:
+    """
+    Lanza `total` llamadas a `send()` (corrutina que hace una petición y
+    devuelve la respuesta) con como mucho `concurrency` a la vez.
+    """
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await send()
+            if response.status_code >= 400:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    stats = latency_stats(latencies, time.perf_counter() - start)
+    stats["errors"] = errors
+    return stats
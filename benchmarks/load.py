@@ -0,0 +1,216 @@
+"""
+Prueba de carga de los endpoints principales con los datos de
+benchmarks.seed: login, listado y búsqueda de alimentos, registrar una
+comida, resumen diario y resumen de un rango.
+
+    python -m benchmarks.load --requests 500 --concurrency 50 --output baseline.json
+    python -m benchmarks.load --compare baseline.json   # tras un cambio
+
+Por defecto las peticiones se lanzan en proceso (httpx.ASGITransport)
+contra app.main:app y la base de datos de DATABASE_URL; con --url se
+prueba un servidor ya arrancado. Con --compare se muestra la diferencia
+de p95 y req/s con la línea base y se sale con código 1 si algún
+escenario empeora más de --threshold.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import user, food, goal, meal, daily_total
+from app.models.food import Food
+from app.models.user import User
+from benchmarks.common import run_load
+
+
+def bench_users(limit: int) -> list:
+    """(id, email, ids de sus alimentos) de los usuarios de benchmarks.seed."""
+    db = SessionLocal()
+    try:
+        users = db.execute(
+            select(User.id, User.email)
+            .where(User.email.like("bench%@example.com"))
+            .order_by(User.id)
+            .limit(limit)
+        ).all()
+        foods = {user_id: [] for user_id, _ in users}
+        for food_id, user_id in db.execute(
+            select(Food.id, Food.user_id).where(Food.user_id.in_(foods))
+        ):
+            foods[user_id].append(food_id)
+    finally:
+        db.close()
+    return [(user_id, email, foods[user_id]) for user_id, email in users]
+
+
+def scenarios(args, users: list, tokens: dict) -> dict:
+    """Nombre -> función que elige un usuario al azar y lanza la petición."""
+    rng = random.Random(args.seed)
+    today = date.today()
+
+    def pick():
+        user_id, email, foods = rng.choice(users)
+        return user_id, email, foods, {"Authorization": f"Bearer {tokens[user_id]}"}
+
+    def random_day():
+        return (today - timedelta(days=rng.randrange(args.days))).isoformat()
+
+    def login(client):
+        _, email, _, _ = pick()
+        return client.post("/auth/login", data={"username": email, "password": args.password})
+
+    def list_foods(client):
+        _, _, _, headers = pick()
+        return client.get("/foods/", params={"limit": 20}, headers=headers)
+
+    def search_foods(client):
+        _, _, _, headers = pick()
+        term = rng.choice(["arr", "ave", "pol", "man", "len", "sal"])
+        return client.get("/foods/", params={"search": term, "limit": 10}, headers=headers)
+
+    def log_meal(client):
+        user_id, _, foods, headers = pick()
+        meal = {"user_id": user_id, "food_id": rng.choice(foods), "quantity": 100}
+        return client.post("/meals/", json=meal, headers=headers)
+
+    def daily_summary(client):
+        user_id, _, _, headers = pick()
+        return client.get(
+            f"/users/{user_id}/summary2", params={"date": random_day()}, headers=headers
+        )
+
+    def range_summary(client):
+        user_id, _, _, headers = pick()
+        params = {
+            "from": (today - timedelta(days=args.days)).isoformat(),
+            "to": today.isoformat(),
+            "granularity": "week",
+        }
+        return client.get(f"/users/{user_id}/summary/range", params=params, headers=headers)
+
+    return {
+        "login": login,
+        "list_foods": list_foods,
+        "search_foods": search_foods,
+        "log_meal": log_meal,
+        "daily_summary": daily_summary,
+        "range_summary": range_summary,
+    }
+
+
+async def run_all(args) -> dict:
+    users = bench_users(args.users)
+    if not users:
+        sys.exit("❌ No hay usuarios de benchmark: lanza antes python -m benchmarks.seed")
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from app.config import settings
+        from app.main import app
+        # Todas las peticiones salen de la misma "IP" y de pocos usuarios
+        settings.rate_limit_enabled = False
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+        )
+
+    async with client:
+        tokens = {}
+        for user_id, email, _ in users:
+            response = await client.post(
+                "/auth/login", data={"username": email, "password": args.password}
+            )
+            response.raise_for_status()
+            tokens[user_id] = response.json()["access_token"]
+
+        selected = args.scenarios.split(",") if args.scenarios else None
+        results = {}
+        for name, send in scenarios(args, users, tokens).items():
+            if selected and name not in selected:
+                continue
+            results[name] = await run_load(
+                lambda: send(client), args.requests, args.concurrency
+            )
+            print(f"{name:>14}: {results[name]}")
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Imprime la diferencia con la línea base; True si algo empeora."""
+    worse = False
+    for name, current in results.items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        p95 = (current["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0
+        req_s = (current["req_s"] - before["req_s"]) / before["req_s"] if before["req_s"] else 0
+        regression = p95 > threshold or req_s < -threshold
+        worse = worse or regression
+        print(
+            f"{'❌' if regression else '✅'} {name:>14}: "
+            f"p95 {before['p95_ms']} -> {current['p95_ms']} ms ({p95:+.0%}), "
+            f"req/s {before['req_s']} -> {current['req_s']} ({req_s:+.0%})"
+        )
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API")
+    parser.add_argument("--url", help="Servidor ya arrancado (por defecto, en proceso)")
+    parser.add_argument("--requests", type=int, default=500, help="Peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=50, help="Usuarios de benchmark a usar")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--days", type=int, default=365, help="Días con datos (como en seed)")
+    parser.add_argument("--scenarios", help="Lista separada por comas; por defecto todos")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Guardar los resultados como línea base (JSON)")
+    parser.add_argument("--compare", help="Línea base con la que comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Empeoramiento tolerado")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_all(args))
+    report = {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "url": args.url or "asgi",
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📦 Resultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Comparando con {baseline['commit']} ({baseline['date']})")
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Rendimiento de POST /auth/login con muchos logins a la vez, con el hash
+en el threadpool (workers=0) y en pools de procesos de distinto tamaño.
+
+    python -m benchmarks.login_throughput --email a@a.com --password secreto \\
+        --workers 0,2,4 --requests 200 --concurrency 50
+
+Mientras dura la ráfaga de logins se mide también la latencia de una
+petición ligera (GET /health/pool) para ver cuánto afecta el hash al
+resto de peticiones del mismo proceso.
+"""
+import argparse
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.utils.passwords import password_hasher
+from benchmarks.common import run_load
+
+
+async def burst(args) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        form = {"username": args.email, "password": args.password}
+        logins = run_load(lambda: client.post("/auth/login", data=form), args.requests, args.concurrency)
+        light = run_load(lambda: client.get("/health/pool"), args.requests, 1)
+        login_stats, light_stats = await asyncio.gather(logins, light)
+    return {"login": login_stats, "other_requests": light_stats}
+
+
+async def run_all(args):
+    # Un solo event loop: el pool del motor asíncrono queda ligado a él
+    for workers in [int(w) for w in args.workers.split(",")]:
+        password_hasher.shutdown()
+        password_hasher.workers = workers
+        # Sin límite de cola: se mide el rendimiento, no el 503
+        password_hasher.queue_size = args.requests
+        result = await burst(args)
+        print(f"workers={workers}: {result}")
+    password_hasher.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de logins concurrentes")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--workers", default="0,2,4", help="Tamaños de pool a probar")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(run_all(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Genera un conjunto de datos sintético para los benchmarks: N usuarios,
+M alimentos por usuario y K comidas por día durante `--days` días.
+
+    python -m benchmarks.seed --users 100 --foods 200 --meals-per-day 4 --days 365
+    python -m benchmarks.seed --reset ...   # borra y recrea las tablas antes
+
+Los usuarios son bench{id}@example.com con la contraseña de --password;
+se añaden a los que ya haya, así que se puede lanzar varias veces.
+Con la misma --seed se generan siempre los mismos datos. Al acabar se
+rellenan las copias de macros de meals y se regenera daily_totals.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.database import Base, SessionLocal, engine
+from app.models import user, food, goal, meal, daily_total, job
+from app.models.food import Food
+from app.models.goal import Goal
+from app.models.meal import Meal
+from app.models.user import User
+from app.services import daily_totals
+from app.services import meals as meal_service
+from app.utils.passwords import hash_password
+
+BATCH_SIZE = 5000
+
+FOOD_NAMES = [
+    "Arroz", "Avena", "Banana", "Brócoli", "Manzana", "Pollo", "Pasta",
+    "Huevo", "Yogur", "Lentejas", "Salmón", "Atún", "Pan integral",
+    "Queso fresco", "Almendras", "Patata", "Tomate", "Zanahoria",
+]
+
+
+def email(i: int) -> str:
+    return f"bench{i}@example.com"
+
+
+def insert_batches(db, model, rows):
+    """Inserta un generador de filas en lotes (executemany)."""
+    batch, total = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.execute(insert(model), batch)
+            total += len(batch)
+            batch.clear()
+    if batch:
+        db.execute(insert(model), batch)
+        total += len(batch)
+    return total
+
+
+def insert_returning(db, model, rows, *columns) -> list:
+    """
+    Como insert_batches, pero devuelve `columns` de cada fila insertada
+    (INSERT ... RETURNING), en el mismo orden que `rows`.
+    """
+    stmt = insert(model).returning(*columns, sort_by_parameter_order=True)
+    batch, returned = [], []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            returned.extend(db.execute(stmt, batch).all())
+            batch.clear()
+    if batch:
+        returned.extend(db.execute(stmt, batch).all())
+    return returned
+
+
+def seed(db, args) -> dict:
+    rng = random.Random(args.seed)
+    # El mismo hash para todos: el coste del hash se mide en el login, no aquí
+    password_hash = hash_password(args.password)
+
+    # Solo para numerar los emails: los ids los da la BD (puede haber huecos)
+    first = (db.scalar(select(func.max(User.id))) or 0) + 1
+    user_ids = [row.id for row in insert_returning(db, User, (
+        {"name": f"Bench {i}", "email": email(i), "password_hash": password_hash, "role": "user"}
+        for i in range(first, first + args.users)
+    ), User.id)]
+    users = len(user_ids)
+
+    insert_batches(db, Goal, (
+        {"user_id": user_id, "calories": 2000, "protein": 120, "carbs": 250, "fat": 70}
+        for user_id in user_ids
+    ))
+
+    def foods_of(user_id):
+        for j in range(args.foods):
+            yield {
+                "user_id": user_id,
+                "name": f"{FOOD_NAMES[j % len(FOOD_NAMES)]} {j}",
+                "calories": round(rng.uniform(20, 600), 1),
+                "protein": round(rng.uniform(0, 30), 1),
+                "carbs": round(rng.uniform(0, 80), 1),
+                "fat": round(rng.uniform(0, 40), 1),
+            }
+
+    food_ids = {user_id: [] for user_id in user_ids}
+    inserted = insert_returning(
+        db, Food, (row for user_id in user_ids for row in foods_of(user_id)), Food.id, Food.user_id
+    )
+    for food_id, user_id in inserted:
+        food_ids[user_id].append(food_id)
+    foods = len(inserted)
+
+    start = date.today() - timedelta(days=args.days)
+
+    def meals_of(user_id):
+        for day in range(args.days):
+            for _ in range(args.meals_per_day):
+                yield {
+                    "user_id": user_id,
+                    "food_id": rng.choice(food_ids[user_id]),
+                    "quantity": rng.choice([50, 100, 150, 200, 250]),
+                    "date": start + timedelta(days=day),
+                }
+
+    meals = insert_batches(db, Meal, (row for user_id in user_ids for row in meals_of(user_id)))
+    meal_service.backfill_snapshots(db)
+    days = daily_totals.rebuild(db)
+    return {"users": users, "foods": foods, "meals": meals, "daily_totals": days}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Datos sintéticos para benchmarks")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--foods", type=int, default=200, help="Alimentos por usuario")
+    parser.add_argument("--meals-per-day", type=int, default=4)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Borrar y recrear las tablas")
+    args = parser.parse_args()
+
+    if args.reset:
+        print("⚠️ Borrando y recreando las tablas...")
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = seed(db, args)
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ {counts} en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Tiempo de serializar listados grandes de alimentos y comidas:
+
+- model+json:   response_model (validación de cada elemento) + json estándar,
+                lo que hacía FastAPI por defecto
+- model+orjson: response_model + ORJSONResponse (default_response_class)
+- rows+orjson:  filas -> dict -> orjson, sin response_model (FAST_JSON_LISTS)
+
+    python -m benchmarks.serialization --rows 1000,10000 --repeat 5
+
+Los datos se generan en una base SQLite en memoria; solo se mide la
+serialización, no la consulta.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import parse_obj_as
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import user, food, goal, meal, daily_total, job
+from app.models.food import Food
+from app.models.meal import Meal
+from app.models.user import User
+from app.routes.foods import FOOD_FIELDS
+from app.schemas.food import FoodOut
+from app.schemas.meal import MealOut
+from app.services import meals as meal_service
+
+
+def seed(db: Session, rows: int):
+    db.execute(insert(User), [{"name": "bench", "email": "bench@example.com", "password_hash": "-"}])
+    db.execute(insert(Food), [
+        {"name": f"Alimento {i}", "calories": 100 + i % 300, "protein": 5.5,
+         "carbs": 20.25, "fat": 3.1, "user_id": 1}
+        for i in range(rows)
+    ])
+    start = date(2025, 1, 1)
+    db.execute(insert(Meal), [
+        {"user_id": 1, "food_id": i % rows + 1, "quantity": 150,
+         "date": start + timedelta(days=i // 5)}
+        for i in range(rows)
+    ])
+    # Copias de nombre y macros, para que MEAL_SNAPSHOTS no lea NULL
+    meal_service.backfill_snapshots(db)
+    db.commit()
+
+
+def model_json(objects, schema, response_class):
+    # Lo mismo que hace FastAPI con un response_model
+    content = jsonable_encoder(parse_obj_as(List[schema], objects))
+    return response_class(content).body
+
+
+def rows_orjson(rows, fields):
+    return ORJSONResponse([{f: getattr(row, f) for f in fields} for row in rows]).body
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de listados")
+    parser.add_argument("--rows", default="1000,10000", help="Tamaños de listado")
+    parser.add_argument("--repeat", type=int, default=5, help="Se queda el mejor tiempo")
+    args = parser.parse_args()
+
+    for rows in [int(n) for n in args.rows.split(",")]:
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            seed(db, rows)
+            food_objects = db.scalars(select(Food)).all()
+            food_rows = db.execute(
+                select(Food.id, Food.name, Food.calories, Food.protein, Food.carbs,
+                       Food.fat, Food.user_id.is_(None).label("is_global"), Food.is_recipe)
+            ).all()
+            meal_rows = db.execute(meal_service.meal_rows(1)).all()
+
+        results = {
+            "foods": {
+                "model+json": timed(lambda: model_json(food_objects, FoodOut, JSONResponse), args.repeat),
+                "model+orjson": timed(lambda: model_json(food_objects, FoodOut, ORJSONResponse), args.repeat),
+                "rows+orjson": timed(lambda: rows_orjson(food_rows, FOOD_FIELDS), args.repeat),
+            },
+            "meals": {
+                "model+json": timed(lambda: model_json(meal_rows, MealOut, JSONResponse), args.repeat),
+                "model+orjson": timed(lambda: model_json(meal_rows, MealOut, ORJSONResponse), args.repeat),
+                "rows+orjson": timed(lambda: rows_orjson(meal_rows, meal_service.MEAL_FIELDS), args.repeat),
+            },
+        }
+        for name, timings in results.items():
+            print(f"{rows:>6} {name}: " + ", ".join(f"{k} {v} ms" for k, v in timings.items()))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Mide lo que tarda un worker nuevo en estar listo, cada vez en un proceso
+nuevo (en frío) contra la base de datos de DATABASE_URL:
+
+- import: `import app.main`
+- create_app: crear la app (aquí se importan rutas, modelos y servicios)
+- startup: evento de arranque (conexiones, catálogo global, pool de hash)
+- first_request / next_request: la primera petición y la media de las
+  siguientes
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --path /foods/ --user 1 --output startup.json
+
+Además muestra los módulos que más tardan en importarse según
+`python -X importtime` (tiempo acumulado, mediana de las ejecuciones).
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from benchmarks.load import git_commit
+
+PHASES = ["import", "create_app", "startup", "first_request", "next_request"]
+
+# Se ejecuta en cada proceso hijo; escribe los tiempos (ms) en stdout
+CHILD = """
+import json, os, sys, time
+
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+from app.utils.security import create_access_token
+
+ready_to_create = time.perf_counter()
+app = app.main.create_app()
+created = time.perf_counter()
+
+user = os.environ.get("STARTUP_BENCH_USER")
+headers = {"Authorization": f"Bearer {create_access_token({'sub': user})}"} if user else {}
+path = os.environ["STARTUP_BENCH_PATH"]
+repeat = int(os.environ["STARTUP_BENCH_REPEAT"])
+
+with TestClient(app) as client:
+    started = time.perf_counter()
+    status = client.get(path, headers=headers).status_code
+    first = time.perf_counter()
+    for _ in range(repeat):
+        client.get(path, headers=headers)
+    done = time.perf_counter()
+
+print(json.dumps({
+    "status": status,
+    "import": (imported - start) * 1000,
+    "create_app": (created - ready_to_create) * 1000,
+    "startup": (started - created) * 1000,
+    "first_request": (first - started) * 1000,
+    "next_request": (done - first) * 1000 / max(repeat, 1),
+}))
+"""
+
+# import time:       self [us] |  cumulative | imported package
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(stderr: str, depth: int) -> dict:
+    """
+    Tiempo acumulado (ms) de cada import de -X importtime hasta `depth`
+    niveles de anidamiento (1 = solo los del propio script).
+    """
+    times = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # La sangría crece dos espacios por nivel
+        if match and (len(match.group(3)) - 1) // 2 < depth:
+            times[match.group(4)] = int(match.group(2)) / 1000
+    return times
+
+
+def run_once(args) -> tuple:
+    env = {
+        **os.environ,
+        "STARTUP_BENCH_PATH": args.path,
+        "STARTUP_BENCH_REPEAT": str(args.repeat),
+    }
+    if args.user:
+        env["STARTUP_BENCH_USER"] = str(args.user)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        sys.exit("\n".join(errors[-20:]))
+    return (
+        json.loads(result.stdout.strip().splitlines()[-1]),
+        import_times(result.stderr, args.depth),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de un worker")
+    parser.add_argument("--runs", type=int, default=5, help="Procesos a arrancar")
+    parser.add_argument("--path", default="/health/pool", help="Ruta de la primera petición")
+    parser.add_argument("--user", type=int, help="Id de usuario para las rutas con token")
+    parser.add_argument("--repeat", type=int, default=20, help="Peticiones tras la primera")
+    parser.add_argument("--top", type=int, default=15, help="Módulos más lentos a mostrar")
+    parser.add_argument("--depth", type=int, default=2, help="Niveles de imports anidados")
+    parser.add_argument("--output", help="Guardar los resultados (JSON)")
+    args = parser.parse_args()
+
+    phases = defaultdict(list)
+    imports = defaultdict(list)
+    for _ in range(args.runs):
+        timings, modules = run_once(args)
+        if timings["status"] >= 400:
+            sys.exit(f"{args.path} responde {timings['status']}")
+        for phase in PHASES:
+            phases[phase].append(timings[phase])
+        for module, ms in modules.items():
+            imports[module].append(ms)
+
+    results = {phase: round(statistics.median(values), 1) for phase, values in phases.items()}
+    results["ready"] = round(sum(results[p] for p in PHASES[:-1]), 1)
+    slowest = sorted(
+        ((module, statistics.median(values)) for module, values in imports.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:args.top]
+
+    print(f"Mediana de {args.runs} arranques (ms):")
+    for phase in [*PHASES, "ready"]:
+        print(f"  {phase:>14}: {results[phase]:8.1f}")
+    print("Imports más lentos (acumulado, ms):")
+    for module, ms in slowest:
+        print(f"  {ms:8.1f}  {module}")
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "params": {"runs": args.runs, "path": args.path},
+            "results": results,
+            "imports": {module: round(ms, 1) for module, ms in slowest},
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📦 Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ from app.models.user import User
 from app.models.food import Food
 from app.models.meal import Meal
 from app.models.goal import Goal
+from app.models.daily_total import DailyTotal
+from app.models.job import Job
 
 print("📦 Creando tablas en la base de datos...")
 Base.metadata.create_all(bind=engine)
@@ -0,0 +1,122 @@
+"""
+Comprueba con EXPLAIN que las consultas de las rutas usan un índice.
+
+    python -m scripts.check_indexes
+
+Necesita la base de datos PostgreSQL de DATABASE_URL con las migraciones
+aplicadas (alembic upgrade head). Ejecuta las consultas reales de cada
+ruta, captura el SQL que emite SQLAlchemy y lanza EXPLAIN (FORMAT JSON)
+sobre cada sentencia con enable_seqscan = off: si aun así el plan hace
+un Seq Scan es que ningún índice puede servir la consulta.
+"""
+import json
+import sys
+from datetime import date
+
+from sqlalchemy import event, text
+
+from app.database import SessionLocal, engine
+from app.models import user, food, goal, meal, daily_total
+from app.models.food import Food
+from app.models.meal import Meal
+from app.services import daily_totals, meals, summary
+from app.services.catalog import visible_to
+
+DAY = date(2025, 1, 1)
+
+# (ruta, índice esperado, función que lanza las consultas de la ruta)
+CHECKS = [
+    (
+        "GET /meals/?day=",
+        "ix_meals_user_id_date",
+        lambda db: db.execute(meals.meal_rows(1).where(Meal.date == DAY)).all(),
+    ),
+    (
+        "GET /users/{id}/summary",
+        "ix_meals_user_id_date",
+        lambda db: summary.get_daily_summary(db, 1, DAY),
+    ),
+    (
+        "GET /users/{id}/summary/range",
+        "daily_totals_pkey",
+        lambda db: summary.get_range_summary(
+            db, 1, DAY, date(2025, 12, 31), summary.Granularity.week
+        ),
+    ),
+    (
+        "GET /foods/",
+        "ix_foods_user_id_name",
+        lambda db: db.query(Food).filter(visible_to(1)).all(),
+    ),
+    (
+        "POST /foods/ (nombre repetido)",
+        "ix_foods_user_id_name",
+        lambda db: db.query(Food).filter(Food.user_id == 1, Food.name == "Banana").first(),
+    ),
+    (
+        "PUT /foods/{id} (trabajo refresh_foods)",
+        "ix_meals_food_id",
+        lambda db: daily_totals.refresh_food_days(db, [1]),
+    ),
+]
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _capture(db, run):
+    """Ejecuta la consulta de la ruta y devuelve las sentencias emitidas."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def main():
+    failed = 0
+    db = SessionLocal()
+    try:
+        for route, index, run in CHECKS:
+            db.execute(text("SET LOCAL enable_seqscan = off"))
+            statements = _capture(db, run)
+
+            for statement, parameters in statements:
+                if statement.lstrip().upper().startswith("SET"):
+                    continue
+                result = db.connection().exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + statement, parameters
+                )
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                nodes = list(_plan_nodes(plan[0]["Plan"]))
+
+                seq_scans = [n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"]
+                indexes = {n.get("Index Name") for n in nodes}
+
+                if index in indexes and not seq_scans:
+                    print(f"✅ {route}: {index}")
+                else:
+                    failed += 1
+                    print(f"❌ {route}: esperado {index}, seq scan en {seq_scans or '-'}")
+                    print(f"   {statement}")
+
+            # Nada de lo ejecutado (p.ej. el DELETE/INSERT de refresh_food_days) se guarda
+            db.rollback()
+    finally:
+        db.close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
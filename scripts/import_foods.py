@@ -0,0 +1,70 @@
+"""
+Importa alimentos de un usuario desde un CSV o NDJSON.
+
+    python -m scripts.import_foods --user 42 alimentos.csv
+    python -m scripts.import_foods --user 42 alimentos.ndjson --on-duplicate update
+
+El CSV lleva cabecera name,calories,protein,carbs,fat. Cada lote se
+guarda con su propio commit, así que si se corta se puede relanzar:
+con --on-duplicate skip lo ya importado se salta.
+"""
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.models import user, food, goal, meal, daily_total
+from app.services import food_import
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="Fichero .csv o .ndjson")
+    parser.add_argument("--user", type=int, required=True, help="Dueño de los alimentos")
+    parser.add_argument(
+        "--format",
+        type=food_import.ImportFormat,
+        choices=list(food_import.ImportFormat),
+        help="Por defecto según la extensión",
+    )
+    parser.add_argument(
+        "--on-duplicate",
+        type=food_import.OnDuplicate,
+        choices=list(food_import.OnDuplicate),
+        default=food_import.OnDuplicate.skip,
+    )
+    parser.add_argument("--batch-size", type=int, default=food_import.BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or food_import.guess_format(args.path)
+    db = SessionLocal()
+
+    def progress(stats):
+        db.commit()
+        done = stats["created"] + stats["updated"] + stats["skipped"] + stats["failed"]
+        print(f"📦 {done} filas procesadas...")
+
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as lines:
+            stats = food_import.import_foods(
+                db,
+                args.user,
+                food_import.iter_records(lines, fmt),
+                args.on_duplicate,
+                args.batch_size,
+                progress,
+            )
+        db.commit()
+    finally:
+        db.close()
+
+    for error in stats["errors"]:
+        print(f"❌ línea {error['line']}: {error['detail']}")
+    print(
+        f"✅ {stats['created']} creados, {stats['updated']} actualizados, "
+        f"{stats['skipped']} saltados, {stats['failed']} con errores"
+    )
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Regenera o comprueba la tabla daily_totals.
+
+    python -m scripts.rebuild_daily_totals              # regenerar todo
+    python -m scripts.rebuild_daily_totals --user 42    # solo un usuario
+    python -m scripts.rebuild_daily_totals --check      # solo comprobar
+"""
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.models import user, food, goal, meal, daily_total
+from app.services import daily_totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user", type=int, help="Limitar a un usuario")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Comparar con los datos originales sin modificar nada",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.check:
+            problems = daily_totals.check(db, args.user)
+            for problem in problems:
+                print(f"❌ {problem}")
+            print(f"📊 {len(problems)} días con diferencias")
+            sys.exit(1 if problems else 0)
+
+        print("📦 Regenerando daily_totals...")
+        rows = daily_totals.rebuild(db, args.user)
+        db.commit()
+        print(f"✅ {rows} días regenerados")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Ejecuta los trabajos en segundo plano de la tabla jobs (app/utils/jobs.py).
+
+    python -m scripts.worker                    # hasta SIGTERM / Ctrl+C
+    python -m scripts.worker --concurrency 8
+    python -m scripts.worker --once             # lo pendiente y salir
+    python -m scripts.worker --failed           # listar los que fallaron
+    python -m scripts.worker --resume-deletions # reencolar bajas a medias
+
+Se pueden lanzar varios a la vez (en una o varias máquinas): cada trabajo
+lo coge uno solo.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import user, food, goal, meal, daily_total, job
+from app.models.job import Job
+from app.models.user import AccountDeletion
+from app.services import tasks
+from app.utils.jobs import JobWorker
+
+
+async def run(args):
+    worker = JobWorker(concurrency=args.concurrency)
+    if args.once:
+        await worker.run_until_idle()
+        return
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # Termina los trabajos en curso antes de salir
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+def show_failed():
+    db = SessionLocal()
+    try:
+        for failed in db.scalars(select(Job).where(Job.status == "failed").order_by(Job.id)):
+            print(f"#{failed.id} {failed.name} {failed.payload} ({failed.attempts} intentos)")
+            print(f"    {(failed.last_error or '').strip().splitlines()[-1:]}")
+    finally:
+        db.close()
+
+
+def resume_deletions():
+    """
+    Vuelve a encolar el borrado de las cuentas que no han terminado (p.ej.
+    si el trabajo agotó los reintentos); retomarlo es seguro.
+    """
+    db = SessionLocal()
+    try:
+        pending = db.scalars(
+            select(AccountDeletion.user_id).where(AccountDeletion.finished_at.is_(None))
+        ).all()
+        for user_id in pending:
+            tasks.delete_user.enqueue(db, user_id=user_id)
+        db.commit()
+        print(f"Borrados de cuenta encolados: {len(pending)}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, help="Por defecto JOB_CONCURRENCY")
+    parser.add_argument("--once", action="store_true", help="Ejecutar lo pendiente y salir")
+    parser.add_argument("--failed", action="store_true", help="Listar los trabajos fallidos")
+    parser.add_argument(
+        "--resume-deletions", action="store_true", help="Reencolar los borrados de cuenta sin terminar"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if args.failed:
+        show_failed()
+    elif args.resume_deletions:
+        resume_deletions()
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
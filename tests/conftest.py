@@ -0,0 +1,108 @@
+"""
+Los tests usan una base de datos SQLite temporal y los backends en
+memoria (trabajos, versiones, límites), sin Redis ni PostgreSQL.
+"""
+import asyncio
+import os
+import tempfile
+
+_, DB_PATH = tempfile.mkstemp(prefix="nutritrace-test-", suffix=".db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["SECRET_KEY"] = "test"
+os.environ["JOB_BACKEND"] = "memory"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.database import Base, engines
+from app.models import user, food, goal, meal, daily_total, job
+from app.models.food import Food
+from app.models.meal import Meal
+from app.models.user import User
+from app.services.nutrition import snapshot
+
+
+def run(coro):
+    """
+    Ejecuta una corrutina en un event loop nuevo y cierra las conexiones
+    asíncronas antes de salir: aiosqlite no las deja usar en otro loop.
+    """
+    async def main():
+        try:
+            return await coro
+        finally:
+            await engines().async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def enforce_foreign_keys(dbapi_connection, connection_record):
+    # SQLite no comprueba las claves ajenas si no se le pide, PostgreSQL sí
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    event.listen(engines().engine, "connect", enforce_foreign_keys)
+    event.listen(engines().async_engine.sync_engine, "connect", enforce_foreign_keys)
+    Base.metadata.create_all(bind=engines().engine)
+    yield
+    engines().engine.dispose()
+    os.remove(DB_PATH)
+
+
+@pytest.fixture
+def db():
+    session = engines().SessionLocal()
+    yield session
+    session.rollback()
+    for table in reversed(Base.metadata.sorted_tables):
+        session.execute(delete(table))
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    def make(name="ana"):
+        db_user = User(name=name, email=f"{name}@example.com", password_hash="-")
+        db.add(db_user)
+        db.flush()
+        return db_user
+
+    return make
+
+
+@pytest.fixture
+def make_food(db):
+    def make(user_id, name="Arroz", calories=100.0, protein=1.0, carbs=20.0, fat=0.5):
+        db_food = Food(
+            user_id=user_id, name=name, calories=calories, protein=protein, carbs=carbs, fat=fat
+        )
+        db.add(db_food)
+        db.flush()
+        return db_food
+
+    return make
+
+
+@pytest.fixture
+def make_meals(db):
+    def make(user_id, food, days, quantity=100.0):
+        """Una comida del alimento por cada fecha de `days`, con su copia."""
+        meals = [
+            Meal(
+                user_id=user_id, food_id=food.id, quantity=quantity, date=day,
+                **snapshot(food, quantity),
+            )
+            for day in days
+        ]
+        db.add_all(meals)
+        db.flush()
+        return meals
+
+    return make
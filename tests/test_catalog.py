@@ -0,0 +1,30 @@
+from app.database import engines
+from app.services import catalog
+from tests.conftest import run
+
+
+def find_food(user_id, food_id):
+    async def main():
+        async with engines().AsyncSessionLocal() as db:
+            return await catalog.find_food(db, user_id, food_id)
+
+    return run(main())
+
+
+def test_find_food_sees_global_foods_missing_from_the_cache(db, make_user, make_food, monkeypatch):
+    catalog.catalog_cache.clear()
+    monkeypatch.setattr(catalog.settings, "catalog_check_interval", 3600)
+    ana_id = make_user().id
+    db.commit()
+    assert find_food(ana_id, 1) is None  # carga la caché, aún vacía
+
+    # Otro proceso crea un alimento global; esta caché no se entera todavía
+    oats = make_food(None, "Avena")
+    own = make_food(ana_id, "Arroz")
+    other = make_food(make_user("luis").id, "Pan")
+    db.commit()
+
+    assert find_food(ana_id, oats.id).is_global
+    assert find_food(ana_id, own.id).name == "Arroz"
+    assert find_food(ana_id, other.id) is None
+    catalog.catalog_cache.clear()
@@ -0,0 +1,51 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models.daily_total import DailyTotal
+from app.services import daily_totals
+
+DAYS = [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 2)]
+
+
+def totals(db):
+    return db.execute(
+        select(DailyTotal.user_id, DailyTotal.date, DailyTotal.calories, DailyTotal.meal_count)
+        .order_by(DailyTotal.user_id, DailyTotal.date)
+    ).all()
+
+
+def test_refresh_food_days_is_idempotent(db, make_user, make_food, make_meals):
+    ana, luis = make_user("ana"), make_user("luis")
+    rice = make_food(ana.id, "Arroz", calories=100)
+    bread = make_food(luis.id, "Pan", calories=250)
+    make_meals(ana.id, rice, DAYS, quantity=200)
+    make_meals(luis.id, bread, DAYS[:1])
+    daily_totals.rebuild(db)
+
+    rice.calories = 150
+    db.flush()
+    daily_totals.refresh_food_days(db, [rice.id])
+    once = totals(db)
+    daily_totals.refresh_food_days(db, [rice.id])
+
+    assert totals(db) == once == [
+        (ana.id, date(2025, 1, 1), 300.0, 1),
+        (ana.id, date(2025, 1, 2), 600.0, 2),
+        (luis.id, date(2025, 1, 1), 250.0, 1),
+    ]
+    assert daily_totals.check(db) == []
+
+
+def test_refresh_days_drops_days_without_meals(db, make_user, make_food, make_meals):
+    ana = make_user()
+    rice = make_food(ana.id)
+    first, *_ = make_meals(ana.id, rice, DAYS)
+    daily_totals.rebuild(db)
+
+    db.delete(first)
+    db.flush()
+    daily_totals.refresh_days(db, [(ana.id, date(2025, 1, 1))])
+
+    assert [row.date for row in totals(db)] == [date(2025, 1, 2)]
+    assert daily_totals.check(db) == []
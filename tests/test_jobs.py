@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.job import Job
+from app.utils import jobs
+from app.utils.jobs import DatabaseJobBackend, JobWorker, MemoryJobBackend, task
+from tests.conftest import run
+
+calls = []
+
+
+@task("test_record")
+async def record(db, value):
+    calls.append(value)
+
+
+@task("test_always_fails", max_attempts=3)
+async def always_fails(db):
+    raise RuntimeError("falla")
+
+
+def enqueue(db, backend, job_task, **payload):
+    backend.enqueue(db, job_task, payload, datetime.utcnow())
+
+
+def test_retry_delay_doubles_up_to_max():
+    assert [jobs.retry_delay(n) for n in (1, 2, 3)] == [5, 10, 20]
+    assert jobs.retry_delay(20) == jobs.RETRY_MAX_SECONDS
+
+
+def test_job_runs_with_its_payload(db):
+    calls.clear()
+    backend = MemoryJobBackend()
+    enqueue(db, backend, record, value=7)
+    db.commit()
+
+    run(JobWorker(backend, concurrency=2, poll_interval=0).run_until_idle())
+
+    assert calls == [7]
+    assert not backend.failed
+
+
+def test_failed_job_is_retried_later_then_marked_failed(db, monkeypatch):
+    backend = MemoryJobBackend()
+    enqueue(db, backend, always_fails)
+    db.commit()
+    worker = JobWorker(backend, concurrency=1, poll_interval=0)
+
+    before = datetime.utcnow()
+    run(worker.run_until_idle())
+    # Primer intento fallido: vuelve a la cola para dentro de 5 s
+    [(retry_at, job)] = backend._queue
+    assert job.attempts == 1
+    assert retry_at >= before + timedelta(seconds=jobs.RETRY_BASE_SECONDS)
+    assert run(backend.claim(10)) == []
+
+    monkeypatch.setattr(jobs, "retry_delay", lambda attempts: 0)
+    backend._queue[0] = (before, job)
+    run(worker.run_until_idle())
+
+    assert not backend._queue
+    [(job, error)] = backend.failed
+    assert job.attempts == always_fails.max_attempts
+    assert "RuntimeError: falla" in error
+
+
+def test_memory_enqueue_is_dropped_on_rollback(db):
+    backend = MemoryJobBackend()
+    enqueue(db, backend, record, value=1)
+    db.rollback()
+    assert run(backend.claim(10)) == []
+
+    enqueue(db, backend, record, value=2)
+    db.commit()
+    [job] = run(backend.claim(10))
+    assert job.payload == {"value": 2}
+
+
+def test_database_enqueue_is_dropped_on_rollback(db):
+    backend = DatabaseJobBackend()
+    enqueue(db, backend, record, value=1)
+    db.rollback()
+    assert db.scalars(select(Job)).all() == []
+
+    enqueue(db, backend, record, value=2)
+    db.commit()
+    assert [j.payload for j in db.scalars(select(Job))] == [{"value": 2}]
+
+
+def test_database_claim_takes_back_jobs_with_expired_lease(db):
+    now = datetime.utcnow()
+    lost = Job(name="test_record", payload={"value": 1}, status="running", attempts=1,
+               run_at=now, locked_at=now - timedelta(hours=1))
+    busy = Job(name="test_record", payload={"value": 2}, status="running", attempts=1,
+               run_at=now, locked_at=now)
+    later = Job(name="test_record", payload={"value": 3}, run_at=now + timedelta(hours=1))
+    db.add_all([lost, busy, later])
+    db.commit()
+
+    claimed = run(DatabaseJobBackend().claim(10))
+
+    assert [(j.id, j.attempts) for j in claimed] == [(lost.id, 2)]
+    db.expire_all()
+    assert db.get(Job, lost.id).status == "running"
+    assert db.get(Job, later.id).status == "queued"
+
+
+def test_database_job_is_deleted_when_done_and_kept_when_failed(db):
+    calls.clear()
+    backend = DatabaseJobBackend()
+    enqueue(db, backend, record, value=5)
+    failing = Job(name="test_always_fails", payload={}, max_attempts=1, run_at=datetime.utcnow())
+    db.add(failing)
+    db.commit()
+
+    run(JobWorker(backend, concurrency=2, poll_interval=0).run_until_idle())
+
+    assert calls == [5]
+    db.expire_all()
+    [left] = db.scalars(select(Job)).all()
+    assert (left.id, left.status, left.attempts) == (failing.id, "failed", 1)
+    assert "RuntimeError" in left.last_error
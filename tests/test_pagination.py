@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+
+from app.database import engines
+from app.models.meal import Meal
+from app.models.user import User
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, paginate
+from tests.conftest import run
+
+
+async def all_pages(stmt, columns, limit, as_rows=False):
+    pages, cursor = [], None
+    async with engines().AsyncSessionLocal() as db:
+        while True:
+            response = Response()
+            rows = await paginate(db, stmt, columns, cursor, limit, response, as_rows)
+            pages.append(rows)
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                return pages
+
+
+def test_pages_cover_every_row_once(db, make_user):
+    ids = [make_user(f"user{i}").id for i in range(5)]
+    db.commit()
+
+    pages = run(all_pages(select(User), [User.id], limit=2))
+
+    assert [[u.id for u in page] for page in pages] == [ids[0:2], ids[2:4], ids[4:]]
+
+
+def test_exact_multiple_has_no_empty_last_page(db, make_user):
+    for i in range(4):
+        make_user(f"user{i}")
+    db.commit()
+
+    pages = run(all_pages(select(User), [User.id], limit=2))
+
+    assert [len(page) for page in pages] == [2, 2]
+
+
+def test_composite_key_with_dates(db, make_user, make_food, make_meals):
+    ana = make_user()
+    rice = make_food(ana.id)
+    days = [date(2025, 1, d) for d in (3, 1, 2, 1, 3)]
+    make_meals(ana.id, rice, days)
+    db.commit()
+
+    stmt = select(Meal.id, Meal.date)
+    pages = run(all_pages(stmt, [Meal.date, Meal.id], limit=2, as_rows=True))
+    rows = [(row.date, row.id) for page in pages for row in page]
+
+    assert rows == sorted(rows)
+    assert len(rows) == len(days)
+
+
+def test_invalid_cursor_is_400():
+    async def page(cursor):
+        async with engines().AsyncSessionLocal() as db:
+            await paginate(db, select(User), [User.id], cursor, 10, Response())
+
+    for cursor in ["no-es-base64!", encode_cursor([1, 2])]:
+        with pytest.raises(HTTPException) as error:
+            run(page(cursor))
+        assert error.value.status_code == 400
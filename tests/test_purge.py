@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from app.database import engines
+from app.models.daily_total import DailyTotal
+from app.models.food import Food, RecipeIngredient
+from app.models.goal import Goal
+from app.models.meal import Meal
+from app.models.user import AccountDeletion, User
+from app.services import daily_totals, purge, tasks
+from app.utils.jobs import JobWorker, job_backend
+from tests.conftest import run
+
+DAYS = [date(2025, 1, 1) + timedelta(days=i) for i in range(5)]
+
+
+def count(db, model, *where):
+    return db.scalar(select(func.count()).select_from(model).where(*where))
+
+
+def account_with_history(db, make_user, make_food, make_meals, name="ana"):
+    """Usuario con 3 alimentos (uno es receta de otro), 10 comidas y objetivos."""
+    owner = make_user(name)
+    rice = make_food(owner.id, "Arroz")
+    bread = make_food(owner.id, "Pan")
+    recipe = make_food(owner.id, "Bocadillo")
+    recipe.is_recipe = True
+    db.add(RecipeIngredient(recipe_id=recipe.id, food_id=bread.id, grams=100))
+    db.add(Goal(user_id=owner.id, calories=2000, protein=100, carbs=200, fat=70))
+    make_meals(owner.id, rice, DAYS)
+    make_meals(owner.id, bread, DAYS)
+    db.add(AccountDeletion(user_id=owner.id))
+    daily_totals.rebuild(db)
+    db.commit()
+    return owner
+
+
+def test_purge_account_resumes_after_interruption(db, make_user, make_food, make_meals):
+    ana = account_with_history(db, make_user, make_food, make_meals)
+    other = account_with_history(db, make_user, make_food, make_meals, name="luis")
+    ana_id, other_id = ana.id, other.id
+
+    # Tres tramos confirmados y un cuarto que se corta antes del commit
+    for _ in range(3):
+        assert purge.purge_account_step(db, ana_id, batch_size=3)
+        db.commit()
+    assert purge.purge_account_step(db, ana_id, batch_size=3)
+    db.rollback()
+    db.close()
+
+    progress = db.get(AccountDeletion, ana_id)
+    assert (progress.meals_deleted, progress.finished_at) == (9, None)
+    assert count(db, Meal, Meal.user_id == ana_id) == 1
+
+    # Otro worker lo retoma desde donde quedó
+    with engines().SessionLocal() as resumed:
+        while purge.purge_account_step(resumed, ana_id, batch_size=3):
+            resumed.commit()
+        resumed.commit()
+        # Y repetirlo con todo borrado no hace nada
+        assert not purge.purge_account_step(resumed, ana_id, batch_size=3)
+        resumed.commit()
+
+    db.expire_all()
+    for model in (Meal, DailyTotal, Goal, Food):
+        assert count(db, model, model.user_id == ana_id) == 0
+    assert db.get(User, ana_id) is None
+    progress = db.get(AccountDeletion, ana_id)
+    assert (progress.meals_deleted, progress.foods_deleted) == (10, 3)
+    assert progress.finished_at is not None
+
+    # Los datos de otros usuarios no se tocan
+    assert count(db, Meal, Meal.user_id == other_id) == 10
+    assert count(db, Food, Food.user_id == other_id) == 3
+    assert count(db, RecipeIngredient) == 1
+    assert daily_totals.check(db) == []
+
+
+def test_delete_user_job_requeues_itself_until_done(db, make_user, make_food, make_meals, monkeypatch):
+    ana_id = account_with_history(db, make_user, make_food, make_meals).id
+    monkeypatch.setattr(tasks, "PURGE_SLICE_SECONDS", -1)  # un tramo por ejecución
+    monkeypatch.setattr(tasks.settings, "purge_batch_size", 4)
+
+    tasks.delete_user.enqueue(db, user_id=ana_id)
+    db.commit()
+    run(JobWorker(job_backend(), poll_interval=0).run_until_idle())
+
+    db.expire_all()
+    assert db.get(User, ana_id) is None
+    assert db.get(AccountDeletion, ana_id).finished_at is not None
+    assert not job_backend().failed
+
+
+def test_purge_food_only_deletes_the_owners_meals(db, make_user, make_food, make_meals):
+    ana, luis = make_user("ana"), make_user("luis")
+    ana_id, luis_id = ana.id, luis.id
+    rice = make_food(ana_id, calories=130.0)
+    rice_id = rice.id
+    make_food(luis_id, "Arroz")  # el nombre de la copia ya está cogido
+    make_meals(ana_id, rice, DAYS)
+    # Anterior a comprobar el dueño en create_meal: luis registró el de ana
+    make_meals(luis_id, rice, DAYS[:2])
+    daily_totals.rebuild(db)
+    db.commit()
+
+    # luis no es el dueño: ni sus comidas ni el alimento se tocan
+    assert purge.purge_food_step(db, luis_id, rice_id, batch_size=10) == 0
+    db.commit()
+    assert count(db, Meal, Meal.user_id == luis_id) == 2
+
+    while purge.purge_food_step(db, ana_id, rice_id, batch_size=2):
+        db.commit()
+    db.commit()
+
+    assert db.get(Food, rice_id) is None
+    assert count(db, Meal, Meal.user_id == ana_id) == 0
+    assert count(db, DailyTotal, DailyTotal.user_id == ana_id) == 0
+    copy = db.scalar(select(Food).where(Food.user_id == luis_id, Food.name == f"Arroz ({rice_id})"))
+    assert copy.calories == 130.0
+    assert count(db, Meal, Meal.user_id == luis_id, Meal.food_id == copy.id) == 2
+    assert daily_totals.check(db) == []
+
+
+def test_purge_account_hands_over_foods_other_users_logged(db, make_user, make_food, make_meals):
+    ana_id = account_with_history(db, make_user, make_food, make_meals).id
+    luis = make_user("luis")
+    luis_id = luis.id
+    bread = db.scalar(select(Food).where(Food.user_id == ana_id, Food.name == "Pan"))
+    make_meals(luis_id, bread, DAYS[:3])
+    sandwich = make_food(luis_id, "Tostada")
+    sandwich.is_recipe = True
+    db.add(RecipeIngredient(recipe_id=sandwich.id, food_id=bread.id, grams=50))
+    daily_totals.rebuild(db)
+    db.commit()
+
+    while purge.purge_account_step(db, ana_id, batch_size=2):
+        db.commit()
+    db.commit()
+
+    assert db.get(User, ana_id) is None
+    assert db.get(AccountDeletion, ana_id).finished_at is not None
+    copy = db.scalar(select(Food).where(Food.user_id == luis_id, Food.name == "Pan"))
+    assert count(db, Meal, Meal.user_id == luis_id, Meal.food_id == copy.id) == 3
+    assert db.scalar(select(RecipeIngredient.food_id)) == copy.id
+    assert daily_totals.check(db) == []
@@ -0,0 +1,66 @@
+import pytest
+from fastapi import HTTPException
+
+from app.utils import rate_limit
+from app.utils.rate_limit import Budget, MemoryRateLimitBackend
+from tests.conftest import run
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_budget_parse():
+    assert Budget.parse("10/minute") == Budget(10, 10 / 60)
+    assert Budget.parse(" 5 / second ") == Budget(5, 5.0)
+    with pytest.raises(ValueError):
+        Budget.parse("10 per minute")
+
+
+def test_bucket_allows_burst_then_waits_for_refill(clock):
+    backend = MemoryRateLimitBackend()
+    budget = Budget(2, 1.0)  # 2 de golpe, 1 ficha por segundo
+
+    assert [run(backend.take("k", budget)) for _ in range(2)] == [0, 0]
+    assert run(backend.take("k", budget)) == pytest.approx(1.0)
+
+    clock.now += 0.5
+    assert run(backend.take("k", budget)) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert run(backend.take("k", budget)) == 0
+    # Sin peticiones el cubo se rellena hasta la capacidad, no más
+    clock.now += 60
+    assert [run(backend.take("k", budget)) for _ in range(3)][-1] > 0
+
+
+def test_buckets_are_per_key(clock):
+    backend = MemoryRateLimitBackend()
+    budget = Budget(1, 1.0)
+
+    assert run(backend.take("user:1", budget)) == 0
+    assert run(backend.take("user:1", budget)) > 0
+    assert run(backend.take("user:2", budget)) == 0
+
+
+def test_check_rate_limit_raises_429_with_retry_after(clock, monkeypatch):
+    backend = MemoryRateLimitBackend()
+    monkeypatch.setattr(rate_limit, "_backend", backend)
+    monkeypatch.setattr(rate_limit, "_budgets", {"login": Budget(1, 1 / 60)})
+
+    run(rate_limit.check_rate_limit("login", "ip:1.2.3.4"))
+    with pytest.raises(HTTPException) as error:
+        run(rate_limit.check_rate_limit("login", "ip:1.2.3.4"))
+
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "60"
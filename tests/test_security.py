@@ -0,0 +1,60 @@
+import pytest
+from fastapi import HTTPException
+
+from app.database import engines
+from app.utils import security
+from app.utils.security import create_access_token, get_current_user, user_cache, user_claims
+from app.utils.token_state import REVOKED, token_state
+from tests.conftest import run
+
+
+@pytest.fixture
+def claims_mode(monkeypatch):
+    monkeypatch.setattr(security.settings, "auth_token_claims", True)
+    token_state().clear()
+    user_cache.clear()
+    yield
+    token_state().clear()
+    user_cache.clear()
+
+
+def authenticate(token):
+    async def main():
+        async with engines().AsyncSessionLocal() as db:
+            return await get_current_user(token, db)
+
+    return run(main())
+
+
+@pytest.mark.parametrize("revoked_to", [1, REVOKED])
+def test_revocation_in_another_worker_beats_the_user_cache(
+    db, make_user, claims_mode, revoked_to
+):
+    ana = make_user()
+    db.commit()
+    token = create_access_token(user_claims(ana))
+    assert authenticate(token).id == ana.id
+    assert user_cache.get(ana.id) is not None
+
+    # Otro worker cambia la contraseña o da de baja la cuenta: su
+    # revoke_tokens() no vacía la caché de este proceso
+    run(token_state().set(ana.id, revoked_to))
+
+    with pytest.raises(HTTPException) as error:
+        authenticate(token)
+    assert error.value.status_code == 401
+    assert user_cache.get(ana.id) is None
+
+
+def test_missing_token_state_reads_the_user_again(db, make_user, claims_mode):
+    ana = make_user()
+    db.commit()
+    token = create_access_token(user_claims(ana))
+    authenticate(token)
+
+    # Sin entrada en token_state (caducada, Redis vaciado) no se usa la caché
+    token_state().clear()
+    ana.token_version = 1
+    db.commit()
+    with pytest.raises(HTTPException):
+        authenticate(token)